@@ -1,38 +1,76 @@
+import asyncio
+import os
 from datetime import timedelta
 
 from dotenv import load_dotenv
 from telegram.ext import ContextTypes
 
 from bot.bot import TelegramBot
+from bot.health import start_health_server
+from bot.notifier import Notifier
 from scrapers.scraper_manager import ScraperManager
+from scrapers.worker import ScrapeWorker
 from utils.db_manager import DBManager
 from utils.logger import setup_logger
 
-SCRAPE_INTERVAL = timedelta(days=1)
+# every replica checks this often; the Mongo lease and last scrape time decide who actually scrapes
+SCRAPE_CHECK_INTERVAL = timedelta(minutes=10)
+# all: bot and scraping in one process; bot/worker: split across processes, talking through MongoDB
+ROLES = ("all", "bot", "worker")
 
 
-def main():
+def run_bot(db_manager: DBManager, scrape: bool):
     logger = setup_logger(__name__)
-    logger.info("Starting Assetsy...")
-    load_dotenv()
-
-    db_manager = DBManager()
     bot = TelegramBot(db_manager)
-    scraper = ScraperManager(bot, db_manager)
-    bot.scraper_manager = scraper
 
-    async def scrape_job(context: ContextTypes.DEFAULT_TYPE):
-        await scraper.process_scrapers()
+    if scrape:
+        scraper = ScraperManager(bot.notifier, db_manager, deliver=bot.outbox.drain)
+        bot.scraper_manager = scraper
+
+        async def scrape_job(context: ContextTypes.DEFAULT_TYPE):
+            await scraper.run_scheduled()
+
+        # misfire grace: the job queue starts after Telegram init, which would otherwise
+        # silently skip the immediate first run
+        bot.application.job_queue.run_repeating(
+            scrape_job, interval=SCRAPE_CHECK_INTERVAL, first=1, job_kwargs={"misfire_grace_time": 300}
+        )
+
+    logger.info("Starting bot...")
+    bot.start()
+
+
+async def run_worker(db_manager: DBManager):
+    notifier = Notifier(db_manager, int(os.environ["TELEGRAM_ADMIN_USER_ID"]))
+    worker = ScrapeWorker(ScraperManager(notifier, db_manager), db_manager, notifier)
 
-    # misfire grace: the job queue starts after Telegram init, which would otherwise
-    # silently skip the immediate first run
-    bot.application.job_queue.run_repeating(
-        scrape_job, interval=SCRAPE_INTERVAL, first=1, job_kwargs={"misfire_grace_time": 300}
-    )
+    health_server = await start_health_server(ready_check=lambda: asyncio.to_thread(db_manager.ping))
+    try:
+        await worker.run(SCRAPE_CHECK_INTERVAL)
+    finally:
+        if health_server:
+            await health_server.stop()
+
+
+def main():
+    # before the logger: LOG_MODE, LOG_FORMAT and LOG_SAMPLING may come from .env
+    load_dotenv()
+    logger = setup_logger(__name__)
+    logger.info("Starting Assetsy...")
 
+    role = os.environ.get("ROLE", "all")
+    if role not in ROLES:
+        raise ValueError(f"Unknown ROLE '{role}', expected one of {', '.join(ROLES)}")
+
+    db_manager = DBManager()
     try:
-        logger.info("Starting bot...")
-        bot.start()
+        if role == "worker":
+            logger.info("Starting scraper worker...")
+            asyncio.run(run_worker(db_manager))
+        else:
+            run_bot(db_manager, scrape=role == "all")
+    except KeyboardInterrupt:
+        pass
     finally:
         db_manager.close()
 
@@ -1,14 +1,18 @@
 import asyncio
 import os
+import time
 import traceback
+import uuid
 from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from enum import Enum, auto
 
 from telegram import BotCommandScopeChat, InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
-from telegram.error import BadRequest, Forbidden, TelegramError
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import (
     Application,
+    ApplicationHandlerStop,
     CallbackContext,
     CallbackQueryHandler,
     CommandHandler,
@@ -19,9 +23,29 @@ from telegram.ext import (
 )
 from telegram.helpers import escape_markdown
 
-from scrapers.scrapers import get_scrapers
+from bot.health import start_health_server
+from bot.notifier import Notifier
+from bot.outbox import OutboxDispatcher
+from bot.subscriptions import SubscriptionBatcher
+from bot.templates import ResponseTemplates
+from scrapers.scrapers import get_scraper, get_scraper_infos
+from utils.circuit_breaker import BreakerState, breaker_key
 from utils.db_manager import DBManager
+from utils.lease import get_replica_shard
 from utils.logger import setup_logger
+from utils.rate_limit import RateLimiter, RecentKeys
+
+OUTBOX_POLL_INTERVAL = timedelta(seconds=30)
+MAX_KEYWORDS = 20
+MAX_KEYWORD_LENGTH = 50
+# per user and action (callback prefix, "command" or "message"): (burst, refill per second)
+RATE_LIMITS = {"sub": (8, 1.0), "default": (5, 0.5)}
+# the same button pressed again within this many seconds is a double tap, not a second request
+DEBOUNCE_SECONDS = 1.0
+# an active user's name/username is written at most this often
+TRACK_USER_INTERVAL = timedelta(minutes=15)
+# how long the admin menu trusts its copy of the scraping flag; our own toggles update it at once
+SCRAPING_FLAG_TTL = timedelta(seconds=30)
 
 
 class CommandType(Enum):
@@ -30,6 +54,7 @@ class CommandType(Enum):
     SUBSCRIBE = auto()
     SHOW_SUBSCRIPTIONS = auto()
     ACTIVE_FREEBIES = auto()
+    KEYWORD_FILTERS = auto()
 
 
 @dataclass
@@ -45,6 +70,7 @@ class TelegramBot:
         Command(CommandType.HELP, "help", "⚙️ Get list of commands"),
         Command(CommandType.SUBSCRIBE, "show_subscriptions", "👀 Show subscriptions"),
         Command(CommandType.ACTIVE_FREEBIES, "show_freebies", "🎁 Show available freebies"),
+        Command(CommandType.KEYWORD_FILTERS, "filters", "🔎 Keyword filters"),
     ]
 
     def __init__(self, db_manager: DBManager):
@@ -55,40 +81,71 @@ class TelegramBot:
         self.admin_user_id = int(os.environ["TELEGRAM_ADMIN_USER_ID"])
 
         self.db_manager = db_manager
-        self.scraper_manager = None  # set in assetsy.py after construction (circular otherwise)
-        self.scrapers = {scraper.get_scraper_name(): scraper for scraper in get_scrapers()}
-
-        self.application = (
-            Application.builder().token(token).concurrent_updates(True).post_init(self._post_init).build()
+        # set in assetsy.py after construction; stays None when a separate worker scrapes (ROLE=bot)
+        self.scraper_manager = None
+        self.notifier = Notifier(db_manager, self.admin_user_id)
+        # metadata only: scraper modules are imported on first use, the bot itself never scrapes
+        self.scrapers = {info.name: info for info in get_scraper_infos()}
+        self.templates = ResponseTemplates(
+            [(cmd.description, cmd.command) for cmd in self.COMMANDS if cmd.type != CommandType.START], self.scrapers
         )
+        self._scraping_enabled: tuple[bool, float] | None = None  # (value, monotonic time read)
+
+        builder = Application.builder().token(token).concurrent_updates(True)
+        if api_url := os.environ.get("TELEGRAM_API_URL"):
+            # e.g. a local fake Bot API for load tests
+            builder = builder.base_url(f"{api_url.rstrip('/')}/bot").base_file_url(f"{api_url.rstrip('/')}/file/bot")
+        self.application = builder.post_init(self._post_init).post_shutdown(self._post_shutdown).build()
+        self.health_server = None
+        self.outbox = OutboxDispatcher(
+            db_manager, self.application.bot, on_blocked=self._remove_user, shard=get_replica_shard()
+        )
+        self.rate_limiter = RateLimiter(RATE_LIMITS)
+        self.repeated_presses = RecentKeys(DEBOUNCE_SECONDS)
+        self.tracked_users = RecentKeys(TRACK_USER_INTERVAL.total_seconds())
+        self.subscriptions = SubscriptionBatcher(db_manager, on_flushed=self._notify_subscription_changes)
         self._setup_handlers()
 
         self.logger.info("Initialization complete")
 
     def start(self):
-        self.application.run_polling(allowed_updates=Update.ALL_TYPES)
+        mode = os.environ.get("TELEGRAM_MODE", "polling")
+        if mode == "polling":
+            self.application.run_polling(allowed_updates=Update.ALL_TYPES)
+        elif mode == "webhook":
+            self._run_webhook()
+        else:
+            raise ValueError(f"Unknown TELEGRAM_MODE '{mode}', expected 'polling' or 'webhook'")
+
+    def _run_webhook(self):
+        # plain HTTP: TLS is terminated by the ingress in front of WEBHOOK_URL
+        public_url = os.environ.get("WEBHOOK_URL", "").rstrip("/")
+        secret_token = os.environ.get("WEBHOOK_SECRET", "")
+        # the compose files pass both through as empty strings when unset
+        if not public_url or not secret_token:
+            raise ValueError("TELEGRAM_MODE=webhook needs WEBHOOK_URL and WEBHOOK_SECRET")
+        url_path = os.environ.get("WEBHOOK_PATH", "telegram").strip("/")
+        listen = os.environ.get("WEBHOOK_LISTEN", "0.0.0.0")
+        port = int(os.environ.get("WEBHOOK_PORT", "8080"))
+        self.logger.info(f"Serving webhook on {listen}:{port}/{url_path} for {public_url}")
+        self.application.run_webhook(
+            listen=listen,
+            port=port,
+            url_path=url_path,
+            webhook_url=f"{public_url}/{url_path}",
+            secret_token=secret_token,
+            max_connections=int(os.environ.get("WEBHOOK_MAX_CONNECTIONS", "40")),
+            allowed_updates=Update.ALL_TYPES,
+        )
 
-    async def notify_subscribers(self, scraper: str, message: str):
-        subscribers = self.db_manager.get_scraper_subscribers(scraper)
-        await self._send_to_users(subscribers, message, parse_mode=ParseMode.MARKDOWN_V2)
+    async def _drain_outbox(self, context: ContextTypes.DEFAULT_TYPE):
+        await self.outbox.drain()
 
-    async def _send_to_users(self, user_ids: list[int], text: str, parse_mode: str | None = None) -> int:
-        tasks = [
-            self.application.bot.send_message(chat_id=user_id, text=text, parse_mode=parse_mode)
-            for user_id in user_ids
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        sent = 0
-        for user_id, result in zip(user_ids, results, strict=True):
-            if isinstance(result, Forbidden):
-                self.logger.warning(f"User {user_id} blocked the bot, removing them")
-                self.db_manager.remove_user(user_id)
-            elif isinstance(result, Exception):
-                self.logger.error(f"Failed to send message to user {user_id}: {result}")
-            else:
-                sent += 1
-        return sent
+    async def _notify_subscription_changes(self, user_id: int, label: str, added: list[str], removed: list[str]):
+        if user_id == self.admin_user_id:
+            return
+        changes = [f"add [{name}]" for name in added] + [f"rem [{name}]" for name in removed]
+        await self._notify_admin(f"👤 {label} {', '.join(changes)}")
 
     async def _notify_admin(self, text: str):
         try:
@@ -97,7 +154,10 @@ class TelegramBot:
             self.logger.warning(f"Failed to notify admin: {e}")
 
     async def _post_init(self, application: Application) -> None:
-        commands = [(cmd.command, cmd.description) for cmd in self.COMMANDS]
+        commands = [(cmd.command, cmd.description) for cmd in self.COMMANDS] + [
+            ("include", "➕ Only notify about titles with these keywords"),
+            ("exclude", "➖ Never notify about titles with these keywords"),
+        ]
         await application.bot.set_my_commands(commands)
         try:
             await application.bot.set_my_commands(
@@ -106,11 +166,24 @@ class TelegramBot:
         except TelegramError as e:
             self.logger.warning(f"Failed to set admin commands (no chat with admin yet?): {e}")
 
+        # picks up jobs left over by a previous process and retries that came due
+        application.job_queue.run_repeating(self._drain_outbox, interval=OUTBOX_POLL_INTERVAL, first=1)
+
+        self.health_server = await start_health_server(ready_check=self._is_ready)
+
+    async def _post_shutdown(self, application: Application) -> None:
+        await self.subscriptions.flush_all()
+        if self.health_server:
+            await self.health_server.stop()
+
+    async def _is_ready(self) -> bool:
+        return await asyncio.to_thread(self.db_manager.ping)
+
     def _setup_handlers(self):
         self.application.add_error_handler(self._handle_error)
 
-        # keeps name/username/created_at fresh for every interacting user
-        self.application.add_handler(TypeHandler(Update, self._track_user), group=-1)
+        # runs before every handler: turns floods away and keeps name/username/created_at fresh
+        self.application.add_handler(TypeHandler(Update, self._gate_update), group=-1)
 
         self.commands_callbacks = {}
         for command in self.COMMANDS:
@@ -118,15 +191,42 @@ class TelegramBot:
             self.application.add_handler(CommandHandler(command.command, callback_method))
             self.commands_callbacks[command.command] = callback_method
 
+        self.application.add_handler(CommandHandler("include", self._include_command))
+        self.application.add_handler(CommandHandler("exclude", self._exclude_command))
         self.application.add_handler(CommandHandler("admin", self._admin_command))
         self.application.add_handler(CallbackQueryHandler(self._handle_callback))
         self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message))
 
-    async def _track_user(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def _gate_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
-        if user and not user.is_bot:
+        if not user or user.is_bot:
+            return
+
+        if user.id != self.admin_user_id:
+            query = update.callback_query
+            if query and self.repeated_presses.seen((user.id, query.data)):
+                await query.answer()
+                raise ApplicationHandlerStop
+            if not self.rate_limiter.allow(user.id, self._action_of(update)):
+                self.logger.info(f"Rate limited user {user.id}")
+                if query:
+                    await query.answer("⏳ Too many requests, slow down a little")
+                raise ApplicationHandlerStop
+
+        if not self.tracked_users.seen(user.id):
             self.db_manager.upsert_user(user.id, user.first_name, user.username)
 
+    @staticmethod
+    def _action_of(update: Update) -> str:
+        if update.callback_query:
+            return (update.callback_query.data or "").split("/")[0]
+        message = update.effective_message
+        return "command" if message and message.text and message.text.startswith("/") else "message"
+
+    def _remove_user(self, user_id: int) -> None:
+        self.db_manager.remove_user(user_id)
+        self.tracked_users.forget(user_id)
+
     async def _handle_error(self, update: Update, context: CallbackContext):
         try:
             exception = context.error
@@ -148,14 +248,6 @@ class TelegramBot:
                 f"Failed to send error message to admin: {e}\n\n{inner_stack_trace}\n\nOriginal error: {exception}"
             )
 
-    def _get_keyboard_markup(self, exclude_commands: list[CommandType] | None = None) -> InlineKeyboardMarkup:
-        keyboard = [
-            [InlineKeyboardButton(cmd.description, callback_data=cmd.command)]
-            for cmd in self.COMMANDS
-            if cmd.type not in (exclude_commands or []) + [CommandType.START]
-        ]
-        return InlineKeyboardMarkup(keyboard)
-
     async def _help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         if update.callback_query:
             await update.callback_query.answer("⚙️ Here are available commands...")
@@ -172,31 +264,21 @@ class TelegramBot:
         await self._render_subscriptions(update)
 
     async def _render_subscriptions(self, update: Update):
-        current_scrapers = self.db_manager.get_user_subscriptions(update.effective_user.id)
-        keyboard = []
-        for scraper_name in self.scrapers:
-            name = self.scrapers[scraper_name].get_friendly_name()
-            subscribed = scraper_name in current_scrapers
-            if subscribed:
-                keyboard.append([InlineKeyboardButton(f"❌ Remove {name}", callback_data=f"sub/rem/{scraper_name}")])
-            else:
-                keyboard.append([InlineKeyboardButton(f"✔️ Add {name}", callback_data=f"sub/add/{scraper_name}")])
-
-        keyboard.append([InlineKeyboardButton("↩ Back", callback_data="help")])
-
-        text = "👀 Update your subscriptions"
-        await self._respond(update, text, reply_markup=InlineKeyboardMarkup(keyboard))
+        keyboard = self.templates.subscriptions(self.subscriptions.current(update.effective_user.id))
+        await self._respond(update, "👀 Update your subscriptions", reply_markup=keyboard)
 
     async def _show_freebies_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         if update.callback_query:
             await update.callback_query.answer("🎁 Here's what's free now...")
 
         user_id = update.effective_user.id
-        subscriptions = self.db_manager.get_user_subscriptions(user_id)
+        # includes toggles not written yet; registry order, as the pending set has none
+        subscriptions = self.subscriptions.current(user_id)
         messages = ["🎁 *Available assets for your subscriptions*"]
-        for scraper_name in subscriptions:
-            if scraper := self.scrapers.get(scraper_name):
-                assets = self.db_manager.get_assets(scraper_name)
+        for scraper_name in self.scrapers:
+            if scraper_name in subscriptions:
+                scraper = get_scraper(scraper_name)
+                assets = scraper.load_data(self.db_manager.get_assets(scraper_name)) or scraper.data_type()
                 messages.append(scraper.create_message(assets))
         freebies_text = "\n\n".join(messages)
 
@@ -209,9 +291,50 @@ class TelegramBot:
         else:
             await update.effective_message.reply_text(freebies_text, parse_mode=ParseMode.MARKDOWN_V2)
         await update.effective_message.reply_text(
-            "⚙️ Choose a command:", reply_markup=self._get_keyboard_markup(), parse_mode=ParseMode.MARKDOWN_V2
+            "⚙️ Choose a command:", reply_markup=self.templates.main_menu, parse_mode=ParseMode.MARKDOWN_V2
         )
 
+    async def _filters_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if update.callback_query:
+            await update.callback_query.answer("🔎 Here are your keyword filters...")
+        await self._render_filters(update)
+
+    async def _include_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        await self._update_filters(update, context, "include")
+
+    async def _exclude_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        await self._update_filters(update, context, "exclude")
+
+    async def _update_filters(self, update: Update, context: ContextTypes.DEFAULT_TYPE, kind: str):
+        # comma-separated so a keyword can be a phrase: /include pixel art, low poly
+        keywords = [keyword.strip().casefold() for keyword in " ".join(context.args or []).split(",")]
+        keywords = [keyword[:MAX_KEYWORD_LENGTH] for keyword in keywords if keyword]
+        if not keywords:
+            await self._respond(update, escape_markdown(f"Usage: /{kind} pixel art, low poly", version=2))
+            return
+
+        current = self.db_manager.get_keyword_filters(update.effective_user.id)
+        if len(set(current.get(kind, [])) | set(keywords)) > MAX_KEYWORDS:
+            await self._respond(update, escape_markdown(f"⚠️ At most {MAX_KEYWORDS} keywords per list", version=2))
+            return
+        self.db_manager.add_keyword_filters(update.effective_user.id, kind, keywords)
+        await self._render_filters(update)
+
+    async def _render_filters(self, update: Update):
+        filters_doc = self.db_manager.get_keyword_filters(update.effective_user.id)
+        include = ", ".join(filters_doc.get("include", [])) or "anything"
+        exclude = ", ".join(filters_doc.get("exclude", [])) or "nothing"
+        text = "\n".join(
+            [
+                "🔎 *Keyword filters*",
+                escape_markdown(f"Notify about titles with: {include}", version=2),
+                escape_markdown(f"Never about titles with: {exclude}", version=2),
+                "",
+                escape_markdown("Add keywords with /include or /exclude, comma-separated.", version=2),
+            ]
+        )
+        await self._respond(update, text, reply_markup=self.templates.filters)
+
     async def _handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         query = update.callback_query
         user_id = update.effective_user.id
@@ -228,22 +351,27 @@ class TelegramBot:
 
         elif command_parts[0] == "sub":
             action, scraper = command_parts[1:]
-            name = self.scrapers[scraper].get_friendly_name()
-            if action == "add":
-                self.db_manager.add_subscription(user_id, scraper)
-                await query.answer(f"✔️ Subscribed to {name}")
-                await self._render_subscriptions(update)
-            elif action == "rem":
-                self.db_manager.remove_subscription(user_id, scraper)
-                await query.answer(f"❌ Unsubscribed from {name}")
-                await self._render_subscriptions(update)
-            else:
+            name = self.scrapers[scraper].friendly_name
+            if action not in ("add", "rem"):
                 self.logger.error(f"Unknown subscription action: {action}")
                 await query.answer("⚠️ Invalid subscription action")
                 return
-            if user_id != self.admin_user_id:
-                user = update.effective_user
-                await self._notify_admin(f"👤 {user.first_name} (@{user.username}, {user_id}) {action} [{scraper}]")
+            # written (and reported to the admin) once the burst of toggles is over, see SubscriptionBatcher
+            user = update.effective_user
+            self.subscriptions.toggle(
+                user_id, scraper, action == "add", f"{user.first_name} (@{user.username}, {user_id})"
+            )
+            await query.answer(f"✔️ Subscribed to {name}" if action == "add" else f"❌ Unsubscribed from {name}")
+            await self._render_subscriptions(update)
+
+        elif command_parts[0] == "flt":
+            if command_parts[1] == "clear":
+                self.db_manager.clear_keyword_filters(user_id)
+                await query.answer("🧹 Filters cleared")
+                await self._render_filters(update)
+            else:
+                self.logger.error(f"Unknown filter action: {command_parts[1]}")
+                await query.answer("⚠️ Invalid filter action")
 
         elif command_parts[0] == "adm":
             if user_id != self.admin_user_id:
@@ -265,23 +393,16 @@ class TelegramBot:
         await self._render_admin_menu(update)
 
     async def _render_admin_menu(self, update: Update):
-        scraping_toggle = (
-            InlineKeyboardButton("⏸ Disable daily updates", callback_data="adm/toggle")
-            if self.db_manager.is_scraping_enabled()
-            else InlineKeyboardButton("▶️ Enable daily updates", callback_data="adm/toggle")
-        )
-        keyboard = InlineKeyboardMarkup(
-            [
-                [InlineKeyboardButton("📊 Stats", callback_data="adm/stats")],
-                [InlineKeyboardButton("👥 Subscribers", callback_data="adm/subs")],
-                [InlineKeyboardButton("🔄 Scrape now", callback_data="adm/scrape")],
-                [scraping_toggle],
-                [InlineKeyboardButton("📢 Broadcast", callback_data="adm/broadcast")],
-                [InlineKeyboardButton("↩ Back", callback_data="help")],
-            ]
-        )
+        keyboard = self.templates.admin_menu(self._is_scraping_enabled())
         await self._respond(update, "🛠 *Admin console*", reply_markup=keyboard)
 
+    def _is_scraping_enabled(self) -> bool:
+        # another replica's toggle shows up within SCRAPING_FLAG_TTL
+        now = time.monotonic()
+        if self._scraping_enabled is None or now - self._scraping_enabled[1] >= SCRAPING_FLAG_TTL.total_seconds():
+            self._scraping_enabled = (self.db_manager.is_scraping_enabled(), now)
+        return self._scraping_enabled[0]
+
     async def _handle_admin_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, action: str):
         query = update.callback_query
 
@@ -296,16 +417,22 @@ class TelegramBot:
                 "📊 *Stats*",
                 escape_markdown(f"Users: {len(users)}", version=2),
             ]
-            for scraper_name, scraper in self.scrapers.items():
+            now = datetime.now(UTC)
+            for scraper_name, info in self.scrapers.items():
                 count = sum(1 for u in users if scraper_name in u.get("subscriptions", []))
-                lines.append(escape_markdown(f"{scraper.get_friendly_name()}: {count} subscribers", version=2))
-            enabled = self.db_manager.is_scraping_enabled()
+                breaker = BreakerState.from_doc(self.db_manager.get_breaker_state(scraper_name))
+                health = self._describe_breaker(breaker, now)
+                quick = BreakerState.from_doc(self.db_manager.get_breaker_state(breaker_key(scraper_name, quick=True)))
+                if quick != BreakerState():
+                    health += f", quick scan {self._describe_breaker(quick, now)}"
+                lines.append(escape_markdown(f"{info.friendly_name}: {count} subscribers, {health}", version=2))
+            enabled = self._is_scraping_enabled()
             lines.append(escape_markdown(f"Daily updates: {'enabled ✅' if enabled else 'DISABLED ⏸'}", version=2))
             last = self.db_manager.get_last_scrape_at()
             lines.append(
                 escape_markdown(f"Last scrape: {last.strftime('%Y-%m-%d %H:%M UTC') if last else 'never'}", version=2)
             )
-            await self._respond(update, "\n".join(lines), reply_markup=self._admin_back_markup())
+            await self._respond(update, "\n".join(lines), reply_markup=self.templates.admin_back)
 
         elif action == "subs":
             await query.answer()
@@ -314,28 +441,54 @@ class TelegramBot:
                 subs = ", ".join(user.get("subscriptions", [])) or "no subscriptions"
                 label = f"{user.get('first_name') or '?'} (@{user.get('username')}, {user['user_id']}): {subs}"
                 lines.append(escape_markdown(f"• {label}", version=2))
-            await self._respond(update, "\n".join(lines), reply_markup=self._admin_back_markup())
+            await self._respond(update, "\n".join(lines), reply_markup=self.templates.admin_back)
 
         elif action == "scrape":
-            await query.answer("🔄 Scrape started...")
-
-            async def run_scrape():
-                await self.scraper_manager.process_scrapers(force=True)
-                await self._notify_admin("✅ Manual scrape finished")
+            if self.scraper_manager is None:
+                # scraping lives in the worker, which reports back through the outbox
+                self.db_manager.request_scrape(update.effective_user.id)
+                status = "Scrape requested, the worker picks it up shortly"
+                await query.answer(f"🔄 {status}")
+                await self._respond(
+                    update, escape_markdown(f"🔄 {status}...", version=2), reply_markup=self.templates.admin_back
+                )
+                return
 
-            self.application.create_task(run_scrape())
-            await self._respond(update, "🔄 Scrape started\\.\\.\\.", reply_markup=self._admin_back_markup())
+            run, joined = self.scraper_manager.start_run("admin", force=True)
+            status = f"Joined scrape run {run.describe()}" if joined else f"Scrape run {run.describe()} started"
+            await query.answer(f"🔄 {status}")
+
+            async def wait_for_run():
+                try:
+                    skipped = await run.wait()
+                except Exception:
+                    if not joined:
+                        raise  # the error handler reports it
+                    # the trigger that started the run reports the error, with its traceback
+                    await self._notify_admin(f"⚠️ Scrape run #{run.run_id} failed, see its error report")
+                    return
+                if skipped:
+                    await self._notify_admin(f"⏭ Scrape run #{run.run_id} was skipped: {skipped}")
+                else:
+                    await self._notify_admin(f"✅ Scrape run #{run.run_id} finished")
+
+            self.application.create_task(wait_for_run())
+            await self._respond(
+                update, escape_markdown(f"🔄 {status}...", version=2), reply_markup=self.templates.admin_back
+            )
 
         elif action == "toggle":
+            # read fresh: toggling a stale copy could undo another replica's change
             enabled = not self.db_manager.is_scraping_enabled()
             self.db_manager.set_scraping_enabled(enabled)
+            self._scraping_enabled = (enabled, time.monotonic())
             await query.answer(f"Daily updates {'enabled ✅' if enabled else 'disabled ⏸'}")
             await self._render_admin_menu(update)
 
         elif action == "broadcast":
             await query.answer()
             context.user_data["awaiting_broadcast"] = True
-            await self._respond(update, "📢 Send me the broadcast message:", reply_markup=self._admin_back_markup())
+            await self._respond(update, "📢 Send me the broadcast message:", reply_markup=self.templates.admin_back)
 
         elif action == "bc_send":
             draft = context.user_data.pop("broadcast_draft", None)
@@ -344,8 +497,14 @@ class TelegramBot:
                 return
             await query.answer("📢 Sending...")
             user_ids = [user["user_id"] for user in self.db_manager.get_all_users()]
-            sent = await self._send_to_users(user_ids, draft)
-            await query.edit_message_text(f"📢 Broadcast sent to {sent}/{len(user_ids)} users")
+            message_id = f"broadcast:{draft['id']}"
+            self.outbox.enqueue(message_id, user_ids, draft["text"])
+            await self.outbox.drain()
+            counts = self.db_manager.count_outbox_jobs(message_id)
+            text = f"📢 Broadcast sent to {counts.get('sent', 0)}/{len(user_ids)} users"
+            if pending := counts.get("pending", 0) + counts.get("sending", 0):
+                text += f" ({pending} still queued)"
+            await query.edit_message_text(text)
 
         elif action == "bc_cancel":
             context.user_data.pop("broadcast_draft", None)
@@ -357,12 +516,19 @@ class TelegramBot:
             self.logger.error(f"Unknown admin action: {action}")
             await query.answer("⚠️ Unknown admin action")
 
-    def _admin_back_markup(self) -> InlineKeyboardMarkup:
-        return InlineKeyboardMarkup([[InlineKeyboardButton("↩ Admin menu", callback_data="adm/menu")]])
+    @staticmethod
+    def _describe_breaker(breaker: BreakerState, now: datetime) -> str:
+        status = breaker.status(now)
+        if status == "closed":
+            return f"healthy ✅ ({breaker.failures} recent failures)" if breaker.failures else "healthy ✅"
+        until = breaker.open_until.strftime("%Y-%m-%d %H:%M UTC")
+        state = f"breaker open until {until} ⛔" if status == "open" else "probing on next run 🔁"
+        return f"{state} ({breaker.failures} failures in a row, last: {breaker.last_error})"
 
     async def _preview_broadcast(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         draft = update.message.text
-        context.user_data["broadcast_draft"] = draft
+        # the id makes a double-pressed "Send" enqueue the same jobs instead of a second broadcast
+        context.user_data["broadcast_draft"] = {"id": uuid.uuid4().hex, "text": draft}
         user_count = len(self.db_manager.get_all_users())
         keyboard = InlineKeyboardMarkup(
             [
@@ -374,7 +540,7 @@ class TelegramBot:
         await update.message.reply_text(f"Preview:\n\n{draft}", reply_markup=keyboard)
 
     async def _respond(self, update: Update, message: str, reply_markup: InlineKeyboardMarkup | None = None):
-        reply_markup = reply_markup or self._get_keyboard_markup()
+        reply_markup = reply_markup or self.templates.main_menu
 
         if update.callback_query:
             try:
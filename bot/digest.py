@@ -0,0 +1,55 @@
+from telegram.constants import MessageLimit
+
+SECTION_SEPARATOR = "\n\n"
+
+
+def chunk_sections(sections: list[str], limit: int = MessageLimit.MAX_TEXT_LENGTH) -> list[str]:
+    """Joins sections into as few messages of at most `limit` characters as possible.
+
+    Splits only between sections, or between lines of a section that is too long on its own, so
+    MarkdownV2 entities (which never span lines here) stay intact. Length is measured on the raw,
+    escaped text, which is never shorter than what Telegram counts.
+    """
+    pieces = []
+    for section in sections:
+        if len(section) <= limit:
+            pieces.append(section)
+        else:
+            pieces.extend(_split_lines(section, limit))
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(SECTION_SEPARATOR) + len(piece) <= limit:
+            current += SECTION_SEPARATOR + piece
+        else:
+            if current:
+                chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_lines(section: str, limit: int) -> list[str]:
+    parts = []
+    current = ""
+    for line in section.split("\n"):
+        # a single line over the limit can't be kept whole
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            # don't separate a MarkdownV2 escape from the character it escapes
+            cut = limit - 1 if line[limit - 1] == "\\" else limit
+            parts.append(line[:cut])
+            line = line[cut:]
+        if current and len(current) + 1 + len(line) <= limit:
+            current += "\n" + line
+        else:
+            if current:
+                parts.append(current)
+            current = line
+    if current:
+        parts.append(current)
+    return parts
@@ -0,0 +1,71 @@
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+
+from utils.logger import setup_logger
+
+# Plain-asyncio HTTP responder for container probes; runs in the bot's event loop so a wedged loop
+# also fails liveness, which is the point
+LIVENESS_PATH = "/healthz"
+READINESS_PATH = "/readyz"
+
+
+class HealthServer:
+    def __init__(self, listen: str, port: int, ready_check: Callable[[], Awaitable[bool]]):
+        self.logger = setup_logger(__name__)
+        self.listen = listen
+        self.port = port
+        self.ready_check = ready_check
+        self._server: asyncio.Server | None = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.listen, self.port)
+        # the one actually bound, when port 0 let the OS pick
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info(f"Health endpoints on {self.listen}:{self.port} ({LIVENESS_PATH}, {READINESS_PATH})")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else ""
+
+            if path == LIVENESS_PATH:
+                status, body = "200 OK", "ok"
+            elif path == READINESS_PATH:
+                ready = await self._is_ready()
+                status, body = ("200 OK", "ready") if ready else ("503 Service Unavailable", "not ready")
+            else:
+                status, body = "404 Not Found", "not found"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n{body}".encode()
+            )
+            await writer.drain()
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _is_ready(self) -> bool:
+        try:
+            return await self.ready_check()
+        except Exception as e:
+            self.logger.warning(f"Readiness check failed: {e}")
+            return False
+
+
+async def start_health_server(ready_check: Callable[[], Awaitable[bool]]) -> HealthServer | None:
+    """Serves the probes on HEALTH_LISTEN:HEALTH_PORT; None when HEALTH_PORT isn't set."""
+    port = int(os.environ.get("HEALTH_PORT", "0"))
+    if not port:
+        return None
+    server = HealthServer(os.environ.get("HEALTH_LISTEN", "0.0.0.0"), port, ready_check)
+    await server.start()
+    return server
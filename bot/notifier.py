@@ -0,0 +1,80 @@
+import os
+from functools import partial
+
+from telegram.constants import ParseMode
+
+from bot.digest import chunk_sections
+from bot.outbox import enqueue_message, make_message_id
+from scrapers.models import ScraperChange
+from scrapers.scrapers import get_scraper
+from utils.db_manager import DBManager
+from utils.keyword_matcher import KeywordFilter, KeywordFilterIndex
+from utils.logger import setup_logger
+
+
+class Notifier:
+    """Turns scrape results into outbox jobs, without a Telegram connection of its own.
+
+    Delivery is the outbox's business: whichever process runs the bot drains it, so a scraper
+    worker (ROLE=worker) hands its notifications over through here.
+    """
+
+    def __init__(self, db_manager: DBManager, admin_user_id: int):
+        self.logger = setup_logger(__name__)
+        self.db_manager = db_manager
+        self.admin_user_id = admin_user_id
+        # one combined message per user and run instead of one per changed marketplace
+        self.digest = os.environ.get("NOTIFY_DIGEST", "1") != "0"
+
+    def enqueue_changes(self, changes: list[ScraperChange]) -> int:
+        """Queues one run's changes: each user gets the sections for their subscriptions in one message
+        (chunked to Telegram's limit), or one message per marketplace with NOTIFY_DIGEST=0. Returns the
+        number of users notified.
+
+        Message ids come from what the sections announce (scraper, stored revision, new state, filter),
+        so a run repeated after a crash maps to the same outbox entries."""
+        texts: dict[str, str] = {}  # section key -> rendered section
+        sections_by_user: dict[int, list[str]] = {}
+        for change in changes:
+            change_key = f"{change.scraper_name}:{change.revision}:{change.new.digest()}"
+            scraper = get_scraper(change.scraper_name)
+            subscribers = self.db_manager.get_scraper_subscriber_filters(change.scraper_name)
+
+            # users with the same filter share one section; one matcher covers every filter's keywords
+            groups: dict[KeywordFilter, list[int]] = {}
+            for user_id, filter_doc in subscribers.items():
+                groups.setdefault(KeywordFilter.from_doc(filter_doc), []).append(user_id)
+            index = KeywordFilterIndex(groups)
+
+            for keyword_filter, user_ids in groups.items():
+                title_filter = None if keyword_filter.is_empty() else partial(index.allows, keyword_filter)
+                section = scraper.create_update_message(change.old, change.new, title_filter)
+                if section is None:
+                    continue
+                key = f"{change_key}:{keyword_filter.key()}"
+                texts[key] = section
+                for user_id in user_ids:
+                    sections_by_user.setdefault(user_id, []).append(key)
+
+        # users with the same subscriptions and filters get the same messages, one outbox entry each
+        recipients: dict[tuple[str, ...], list[int]] = {}
+        for user_id, keys in sections_by_user.items():
+            recipients.setdefault(tuple(keys), []).append(user_id)
+
+        for keys, user_ids in recipients.items():
+            if self.digest:
+                batches = [(" ".join(keys), chunk_sections([texts[key] for key in keys]))]
+            else:
+                batches = [(key, chunk_sections([texts[key]])) for key in keys]
+            for batch_key, messages in batches:
+                for index, message in enumerate(messages):
+                    message_id = make_message_id("digest", f"{batch_key}#{index}")
+                    self.enqueue(message_id, user_ids, message, ParseMode.MARKDOWN_V2)
+        self.logger.info(f"Queued updates from {len(changes)} scraper(s) for {len(sections_by_user)} user(s)")
+        return len(sections_by_user)
+
+    def notify_admin(self, message_id: str, text: str) -> None:
+        self.enqueue(message_id, [self.admin_user_id], text)
+
+    def enqueue(self, message_id: str, user_ids: list[int], text: str, parse_mode: str | None = None) -> int:
+        return enqueue_message(self.db_manager, message_id, user_ids, text, parse_mode)
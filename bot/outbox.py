@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+from collections.abc import Callable
+from datetime import timedelta
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from utils.db_manager import DBManager
+from utils.logger import setup_logger
+
+SEND_CONCURRENCY = 20
+# a claimed job is considered abandoned (crash, deploy) once this runs out
+CLAIM_LEASE = timedelta(minutes=2)
+MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = timedelta(seconds=30)
+RETRY_MAX_DELAY = timedelta(hours=1)
+
+
+def make_message_id(kind: str, key: str) -> str:
+    """Stable id for the message identified by key, so re-enqueueing it after a restart dedups.
+
+    key names what the message announces (e.g. a change to one stored revision), not its text: the same
+    text sent again for a later change is a new message.
+    """
+    return f"{kind}:{hashlib.sha256(key.encode()).hexdigest()[:32]}"
+
+
+def enqueue_message(
+    db_manager: DBManager, message_id: str, user_ids: list[int], text: str, parse_mode: str | None = None
+) -> int:
+    """Persists a message for the given users, for whichever process drains the outbox; returns the new jobs."""
+    added = db_manager.enqueue_outbox_message(message_id, user_ids, text, parse_mode)
+    setup_logger(__name__).info(f"Queued message [{message_id}] for {added}/{len(user_ids)} users")
+    return added
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+def _as_timedelta(value: int | float | timedelta) -> timedelta:
+    # RetryAfter.retry_after is seconds or a timedelta depending on the PTB version/config
+    return value if isinstance(value, timedelta) else timedelta(seconds=value)
+
+
+class OutboxDispatcher:
+    """Delivers persisted outbox jobs at-least-once; safe to run in several places against the same DB."""
+
+    def __init__(
+        self,
+        db_manager: DBManager,
+        bot: Bot,
+        on_blocked: Callable[[int], None],
+        shard: tuple[int, int] | None = None,
+    ):
+        self.logger = setup_logger(__name__)
+        self.db_manager = db_manager
+        # with several replicas each one delivers to its own slice of users, see get_replica_shard
+        self.shard = shard
+        self.bot = bot
+        self.on_blocked = on_blocked
+        self._messages: dict[str, dict | None] = {}
+        self._lock = asyncio.Lock()
+        self._dirty = False
+
+    def enqueue(self, message_id: str, user_ids: list[int], text: str, parse_mode: str | None = None) -> int:
+        added = enqueue_message(self.db_manager, message_id, user_ids, text, parse_mode)
+        self._dirty = True
+        return added
+
+    async def drain(self) -> int:
+        """Sends every due job; returns how many were delivered by this call."""
+        if self._lock.locked():
+            # the running drain loops again before finishing, no need to wait for it
+            self._dirty = True
+            return 0
+
+        sent = 0
+        async with self._lock:
+            while True:
+                self._dirty = False
+                results = await asyncio.gather(*(self._worker() for _ in range(SEND_CONCURRENCY)))
+                sent += sum(results)
+                if not self._dirty:
+                    break
+            self._messages.clear()
+        if sent:
+            self.logger.info(f"Outbox drained, {sent} messages delivered")
+        return sent
+
+    async def _worker(self) -> int:
+        sent = 0
+        while job := self.db_manager.claim_outbox_job(CLAIM_LEASE, self.shard):
+            sent += await self._deliver(job)
+        return sent
+
+    async def _deliver(self, job: dict) -> int:
+        message = self._get_message(job["message_id"])
+        if message is None:
+            self.db_manager.fail_outbox_job(job["_id"], "message expired")
+            return 0
+
+        user_id = job["user_id"]
+        try:
+            await self.bot.send_message(chat_id=user_id, text=message["text"], parse_mode=message["parse_mode"])
+        except Forbidden as e:
+            self.logger.warning(f"User {user_id} blocked the bot, removing them")
+            self.on_blocked(user_id)
+            self.db_manager.fail_outbox_job(job["_id"], str(e))
+        except BadRequest as e:
+            # not going to get better on retry (bad markup, chat not found)
+            self.logger.error(f"Failed to send message to user {user_id}: {e}")
+            self.db_manager.fail_outbox_job(job["_id"], str(e))
+        except TelegramError as e:
+            if job["attempts"] >= MAX_ATTEMPTS:
+                self.logger.error(f"Giving up on message to user {user_id} after {job['attempts']} attempts: {e}")
+                self.db_manager.fail_outbox_job(job["_id"], str(e))
+            else:
+                delay = retry_delay(job["attempts"])
+                if isinstance(e, RetryAfter):
+                    delay = max(delay, _as_timedelta(e.retry_after))
+                self.logger.warning(f"Failed to send message to user {user_id}, retrying in {delay}: {e}")
+                self.db_manager.retry_outbox_job(job["_id"], delay, str(e))
+        else:
+            self.db_manager.complete_outbox_job(job["_id"])
+            return 1
+        return 0
+
+    def _get_message(self, message_id: str) -> dict | None:
+        if message_id not in self._messages:
+            self._messages[message_id] = self.db_manager.get_outbox_message(message_id)
+        return self._messages[message_id]
@@ -0,0 +1,87 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from utils.db_manager import DBManager
+from utils.logger import setup_logger
+
+# a burst of toggles is written once the user has left the keyboard alone this long
+FLUSH_DELAY = timedelta(seconds=3)
+
+
+@dataclass
+class PendingToggles:
+    base: frozenset[str]  # stored subscriptions when the burst started
+    desired: set[str]
+    label: str  # who, for the admin notice
+    timer: asyncio.Task | None = field(default=None, repr=False)
+
+    def net_changes(self) -> tuple[list[str], list[str]]:
+        """(added, removed) against the stored state; toggles that cancelled out are gone."""
+        return sorted(self.desired - self.base), sorted(self.base - self.desired)
+
+
+class SubscriptionBatcher:
+    """Coalesces a burst of subscription toggles into one DB write and one admin notice.
+
+    The keyboard is re-rendered from the pending state straight away, so only the first toggle of a
+    burst reads the DB. Pending toggles are in memory: a crash within FLUSH_DELAY of the last press
+    loses that burst, the user sees their old subscriptions on the next /show_subscriptions.
+    """
+
+    def __init__(
+        self,
+        db_manager: DBManager,
+        on_flushed: Callable[[int, str, list[str], list[str]], Awaitable[None]],
+        delay: timedelta = FLUSH_DELAY,
+    ):
+        self.logger = setup_logger(__name__)
+        self.db_manager = db_manager
+        self.on_flushed = on_flushed
+        self.delay = delay
+        self._pending: dict[int, PendingToggles] = {}
+
+    def current(self, user_id: int) -> set[str]:
+        """The user's subscriptions as they'll be once pending toggles are written."""
+        if pending := self._pending.get(user_id):
+            return set(pending.desired)
+        return set(self.db_manager.get_user_subscriptions(user_id))
+
+    def toggle(self, user_id: int, scraper_name: str, subscribe: bool, label: str) -> set[str]:
+        pending = self._pending.get(user_id)
+        if pending is None:
+            base = frozenset(self.db_manager.get_user_subscriptions(user_id))
+            pending = self._pending[user_id] = PendingToggles(base, set(base), label)
+        if subscribe:
+            pending.desired.add(scraper_name)
+        else:
+            pending.desired.discard(scraper_name)
+
+        if pending.timer:
+            pending.timer.cancel()
+        pending.timer = asyncio.create_task(self._flush_later(user_id))
+        return set(pending.desired)
+
+    async def flush(self, user_id: int) -> None:
+        pending = self._pending.pop(user_id, None)
+        if pending is None:
+            return
+        if pending.timer and pending.timer is not asyncio.current_task():
+            pending.timer.cancel()
+        added, removed = pending.net_changes()
+        if not added and not removed:
+            return
+        self.db_manager.update_subscriptions(user_id, added, removed)
+        await self.on_flushed(user_id, pending.label, added, removed)
+
+    async def flush_all(self) -> None:
+        for user_id in list(self._pending):
+            await self.flush(user_id)
+
+    async def _flush_later(self, user_id: int) -> None:
+        await asyncio.sleep(self.delay.total_seconds())
+        try:
+            await self.flush(user_id)
+        except Exception:
+            self.logger.exception(f"Failed to write subscriptions of user {user_id}")
@@ -0,0 +1,58 @@
+from collections.abc import Iterable
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from scrapers.scrapers import ScraperInfo
+
+
+def _column(*buttons: tuple[str, str]) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([[InlineKeyboardButton(text, callback_data=data)] for text, data in buttons])
+
+
+class ResponseTemplates:
+    """Inline keyboards built once and shared by every response (PTB's markups are immutable).
+
+    The static ones are built here; subscription keyboards once per subscription set, of which the
+    registry allows only 2^N. The registry is fixed for the life of the process, so nothing goes stale.
+    """
+
+    def __init__(self, menu: list[tuple[str, str]], scrapers: dict[str, ScraperInfo]):
+        """menu: the main menu's (label, callback data) pairs."""
+        self.scrapers = scrapers
+        self.main_menu = _column(*menu)
+        self.filters = _column(("🧹 Clear filters", "flt/clear"), ("↩ Back", "help"))
+        self.admin_back = _column(("↩ Admin menu", "adm/menu"))
+        self._admin_menus = {enabled: self._build_admin_menu(enabled) for enabled in (True, False)}
+        self._subscriptions: dict[frozenset[str], InlineKeyboardMarkup] = {}
+
+    def admin_menu(self, scraping_enabled: bool) -> InlineKeyboardMarkup:
+        return self._admin_menus[scraping_enabled]
+
+    def subscriptions(self, subscribed: Iterable[str]) -> InlineKeyboardMarkup:
+        # names no longer in the registry don't change the keyboard, keep them out of the key
+        key = frozenset(name for name in subscribed if name in self.scrapers)
+        markup = self._subscriptions.get(key)
+        if markup is None:
+            markup = self._subscriptions[key] = self._build_subscriptions(key)
+        return markup
+
+    def _build_subscriptions(self, subscribed: frozenset[str]) -> InlineKeyboardMarkup:
+        buttons = []
+        for scraper_name, info in self.scrapers.items():
+            if scraper_name in subscribed:
+                buttons.append((f"❌ Remove {info.friendly_name}", f"sub/rem/{scraper_name}"))
+            else:
+                buttons.append((f"✔️ Add {info.friendly_name}", f"sub/add/{scraper_name}"))
+        return _column(*buttons, ("↩ Back", "help"))
+
+    @staticmethod
+    def _build_admin_menu(scraping_enabled: bool) -> InlineKeyboardMarkup:
+        toggle = "⏸ Disable daily updates" if scraping_enabled else "▶️ Enable daily updates"
+        return _column(
+            ("📊 Stats", "adm/stats"),
+            ("👥 Subscribers", "adm/subs"),
+            ("🔄 Scrape now", "adm/scrape"),
+            (toggle, "adm/toggle"),
+            ("📢 Broadcast", "adm/broadcast"),
+            ("↩ Back", "help"),
+        )
@@ -0,0 +1,106 @@
+"""Dry-run scrapers in parallel and report how they did, without storing or notifying anything.
+
+uv run python -m scrapers                # every scraper, diffed against the stored state
+uv run python -m scrapers itch unity     # just these
+uv run python -m scrapers --no-db        # no MongoDB, just scrape and time
+
+HTTP_CACHE_DIR is ignored, every source is fetched in full.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+from scrapers.models import ScrapedData
+from scrapers.scraper_interface import NOT_MODIFIED, ScraperInterface, run_scrape
+from scrapers.scrapers import get_scraper, get_scraper_infos
+from utils.db_manager import DBManager
+from utils.table import format_table
+
+
+@dataclass
+class DryRunResult:
+    name: str
+    seconds: float
+    items: int | None = None
+    bytes_fetched: int | None = None
+    status: str = ""
+
+
+def describe_change(scraper: ScraperInterface, stored: ScrapedData | None, new: ScrapedData) -> str:
+    if stored is None:
+        return "new"
+    if new == stored:
+        return "unchanged"
+    old_ids, new_ids = scraper.get_item_ids(stored), scraper.get_item_ids(new)
+    return f"changed +{len(new_ids - old_ids)} -{len(old_ids - new_ids)}"
+
+
+async def dry_run(name: str, db_manager: DBManager | None) -> DryRunResult:
+    scraper = get_scraper(name)
+    started = time.perf_counter()
+    try:
+        scraped = await run_scrape(scraper)
+    except Exception as e:
+        return DryRunResult(name, time.perf_counter() - started, status=f"failed: {e!r}")
+    new = scraped.data
+    if new is NOT_MODIFIED:
+        return DryRunResult(name, time.perf_counter() - started, None, scraped.bytes_fetched, "not modified (304)")
+    result = DryRunResult(name, time.perf_counter() - started, len(scraper.get_item_ids(new)), scraped.bytes_fetched)
+
+    if db_manager is None:
+        result.status = "not compared"
+    else:
+        stored = scraper.load_data(await asyncio.to_thread(db_manager.get_assets, name))
+        result.status = describe_change(scraper, stored, new)
+    return result
+
+
+def format_results(results: list[DryRunResult]) -> str:
+    rows = [("scraper", "duration", "items", "bytes", "status")]
+    for result in results:
+        rows.append(
+            (
+                result.name,
+                f"{result.seconds:.1f}s",
+                "-" if result.items is None else str(result.items),
+                "n/a" if result.bytes_fetched is None else f"{result.bytes_fetched:,}",
+                result.status,
+            )
+        )
+    return format_table(rows)
+
+
+async def run(names: list[str], db_manager: DBManager | None) -> list[DryRunResult]:
+    return list(await asyncio.gather(*(dry_run(name, db_manager) for name in names)))
+
+
+def main():
+    known = [info.name for info in get_scraper_infos()]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", choices=known, metavar="scraper", help=f"any of {', '.join(known)}")
+    parser.add_argument("--no-db", action="store_true", help="don't read the stored state from MongoDB")
+    args = parser.parse_args()
+    load_dotenv()
+    # no HTTP cache: validators stored by a dry run would turn the bot's next fetch into a 304 it never parsed,
+    # and a dry run should see the sources as they are anyway
+    os.environ.pop("HTTP_CACHE_DIR", None)
+
+    db_manager = None if args.no_db else DBManager()
+    try:
+        results = asyncio.run(run(args.names or known, db_manager))
+    finally:
+        if db_manager:
+            db_manager.close()
+
+    print(format_results(results))
+    sys.exit(1 if any(result.status.startswith("failed") for result in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
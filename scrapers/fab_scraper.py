@@ -1,23 +1,66 @@
+import hashlib
 import json
 import re
+from dataclasses import replace
 
-from selenium.webdriver.common.by import By
 from telegram.helpers import escape_markdown
 
-from scrapers.scraper_interface import ScraperInterface
+from scrapers.models import FabData, FabItem
+from scrapers.scraper_interface import NOT_MODIFIED, ScrapeResult, ScraperInterface, TitleFilter
+from utils.http_cache import get_http_cache
 from utils.logger import setup_logger
-from utils.selenium_driver import get_driver
 
 # Cloudflare 403s plain python HTTP clients (TLS fingerprinting), so this API is
 # fetched through the Selenium browser instead
 HOMEPAGE_LAYOUT_URL = "https://www.fab.com/i/layouts/homepage"
+# small same-origin page to land on, so the in-page fetch carries fab.com's cookies
+SAME_ORIGIN_URL = "https://www.fab.com/robots.txt"
 FREE_BLADE_TITLE = "Limited-Time Free"
+ALL_ITEMS_TITLE = "ALL ITEMS"
+FETCH_SCRIPT_TIMEOUT_SECONDS = 30
+
+# Fetches the layout inside the page and sends back only what _parse_free_items reads: the free
+# carousel entry and the free blade's listing uids/titles, instead of the whole payload over WebDriver.
+# Sends the cached validators and reports a 304 as {notModified: true}.
+FETCH_FREE_LAYOUT_SCRIPT = """
+const [url, freeTitle, validators, done] = arguments;
+const trim = (homepage) => ({
+  carousel: (homepage.carousel || [])
+    .filter((item) => item.title === freeTitle)
+    .map((item) => ({title: item.title, ctaUrl: item.ctaUrl})),
+  blades: (homepage.blades || [])
+    .filter((blade) => (blade.title || "").includes(freeTitle) && blade.title.includes("Until"))
+    .slice(0, 1)
+    .map((blade) => ({
+      title: blade.title,
+      tiles: (blade.tiles || []).map((tile) => ({
+        listing: {uid: tile.listing?.uid, title: tile.listing?.title},
+      })),
+    })),
+});
+fetch(url, {credentials: "include", headers: {Accept: "application/json", ...validators}})
+  .then(async (response) => {
+    if (response.status === 304) return done({notModified: true});
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    const body = await response.text();
+    done({
+      ...trim(JSON.parse(body)),
+      bytes: new TextEncoder().encode(body).length,
+      etag: response.headers.get("ETag"),
+      lastModified: response.headers.get("Last-Modified"),
+    });
+  })
+  .catch((error) => done({error: String(error)}));
+"""
 
 
 class FabScraper(ScraperInterface):
+    data_type = FabData
+
     def __init__(self) -> None:
         super().__init__()
         self.logger = setup_logger(__name__)
+        self.http_cache = get_http_cache(self.get_scraper_name())
 
     def get_scraper_name(self) -> str:
         return "unreal_fab_marketplace"
@@ -25,48 +68,107 @@ class FabScraper(ScraperInterface):
     def get_friendly_name(self) -> str:
         return "Unreal Engine (Fab Marketplace)"
 
-    def scrape_data(self) -> dict:
+    def scrape_data(self) -> ScrapeResult:
+        # selenium is only needed once we actually scrape, bot-only processes never import it
+        from utils.selenium_driver import get_driver
+
         self.logger.info("Fetching Fab marketplace assets...")
         driver = get_driver()
         try:
-            driver.get(HOMEPAGE_LAYOUT_URL)
-            homepage = json.loads(driver.find_element(By.TAG_NAME, "pre").text)
+            result = self._fetch_free_layout(driver)
+            if result is None:
+                homepage, bytes_fetched = self._fetch_homepage(driver)
+                result = ScrapeResult(self._parse_free_items(homepage), bytes_fetched=bytes_fetched)
         finally:
             driver.quit()
-        result = self._parse_free_items(homepage)
-
-        total_assets = len(result.get("items", []))
-        self.logger.info(f"Done, found {total_assets} assets")
+        if result.data is NOT_MODIFIED:
+            self.logger.info("Layout not modified")
+        else:
+            self.logger.info(f"Done, found {len(result.data.items)} assets")
         return result
 
-    def create_message(self, data: dict) -> str:
+    def create_message(self, data: FabData) -> str:
         messages = []
-        end_date = escape_markdown(data.get("end_date", "<Unknown end date>"), version=2)
+        end_date = escape_markdown(data.end_date or "<Unknown end date>", version=2)
         messages.append(f"🦭 *UE Fab Marketplace Free Assets* \\({end_date}\\):")
 
-        for item in data.get("items", []):
-            title = escape_markdown(item.get("title", "<unknown>"), version=2)
-            url = escape_markdown(item.get("url", "<no-url>"), version=2, entity_type="text_link")
+        for item in data.items:
+            title = escape_markdown(item.title or "<unknown>", version=2)
+            url = escape_markdown(item.url or "<no-url>", version=2, entity_type="text_link")
             messages.append(f" \\- [{title}]({url})")
 
-        if not data.get("items"):
+        if not data.items:
             messages.append(" \\- ⚠️ No free items found")
 
         return "\n".join(messages)
 
-    def _parse_free_items(self, homepage: dict) -> dict[str, list[dict]]:
-        result = {"end_date": "", "items": []}
-        self._parse_carousel_url(homepage, result)
-        self._parse_blades_items(homepage, result)
-        return result
+    def get_item_ids(self, data: FabData) -> set[str]:
+        return {item.url for item in data.items if item.title != ALL_ITEMS_TITLE}
+
+    def filter_data(self, data: FabData, title_filter: TitleFilter) -> FabData | None:
+        matched = tuple(item for item in data.items if item.title != ALL_ITEMS_TITLE and title_filter(item.title))
+        if not matched:
+            return None
+        # the "all items" link stays, it's where the rest of the list lives
+        return replace(data, items=tuple(item for item in data.items if item.title == ALL_ITEMS_TITLE) + matched)
+
+    def invalidate_cache(self) -> None:
+        if self.http_cache:
+            self.http_cache.clear()
 
-    def _parse_carousel_url(self, homepage, result):
+    def _fetch_free_layout(self, driver) -> ScrapeResult | None:
+        """Free items from the layout fetched in the browser; None if that failed and the full page is needed."""
+        from selenium.common.exceptions import WebDriverException
+
+        cached = self.http_cache.lookup(HOMEPAGE_LAYOUT_URL) if self.http_cache else None
+        validators = cached.conditional_headers() if cached else {}
+        try:
+            driver.get(SAME_ORIGIN_URL)
+            driver.set_script_timeout(FETCH_SCRIPT_TIMEOUT_SECONDS)
+            result = driver.execute_async_script(
+                FETCH_FREE_LAYOUT_SCRIPT, HOMEPAGE_LAYOUT_URL, FREE_BLADE_TITLE, validators
+            )
+        except WebDriverException as e:
+            self.logger.warning(f"In-browser layout fetch failed, loading the full page: {e.msg}")
+            return None
+        if not isinstance(result, dict) or "error" in result:
+            self.logger.warning(f"In-browser layout fetch failed, loading the full page: {result}")
+            return None
+        if result.get("notModified") and cached:
+            self.http_cache.hits += 1
+            return ScrapeResult(NOT_MODIFIED, _source_version(cached.etag, cached.last_modified))
+
+        bytes_fetched = result.pop("bytes", None)
+        etag, last_modified = result.pop("etag", None), result.pop("lastModified", None)
+        source_version = None
+        if self.http_cache:
+            self.http_cache.misses += 1
+            body = json.dumps(result).encode()
+            self.http_cache.store(HOMEPAGE_LAYOUT_URL, etag, last_modified, body, {"Content-Type": "application/json"})
+            source_version = _source_version(etag, last_modified)
+        return ScrapeResult(self._parse_free_items(result), source_version, bytes_fetched)
+
+    def _fetch_homepage(self, driver) -> tuple[dict, int]:
+        """The full homepage layout and its size in bytes."""
+        from selenium.webdriver.common.by import By
+
+        driver.get(HOMEPAGE_LAYOUT_URL)
+        body = driver.find_element(By.TAG_NAME, "pre").text
+        return json.loads(body), len(body.encode())
+
+    def _parse_free_items(self, homepage: dict) -> FabData:
+        items = self._parse_carousel_url(homepage)
+        end_date, blade_items = self._parse_blades_items(homepage)
+        return FabData(end_date, tuple(items + blade_items))
+
+    def _parse_carousel_url(self, homepage) -> list[FabItem]:
         for carousel_item in homepage.get("carousel", []):
             if carousel_item.get("title") == FREE_BLADE_TITLE:
-                result["items"].append({"title": "ALL ITEMS", "url": carousel_item.get("ctaUrl")})
-                break
+                return [FabItem(ALL_ITEMS_TITLE, carousel_item.get("ctaUrl"))]
+        return []
 
-    def _parse_blades_items(self, homepage, result):
+    def _parse_blades_items(self, homepage) -> tuple[str, list[FabItem]]:
+        end_date = ""
         free_blade = None
         for blade in homepage.get("blades", []):
             title = blade.get("title", "")
@@ -75,23 +177,29 @@ class FabScraper(ScraperInterface):
 
                 date_match = re.search(r"\((.*?)\)", title) or re.search(r"Until\s+(.*)", title)
                 if date_match:
-                    result["end_date"] = date_match.group(1)
+                    end_date = date_match.group(1)
                 break
 
         if not free_blade:
-            return
+            return end_date, []
 
         # everything in this blade is free — don't filter by price fields, Fab removes them
+        items = []
         for tile in free_blade.get("tiles", []):
             listing = tile.get("listing", {})
             uid = listing.get("uid")
             title = listing.get("title")
             if uid and title:
-                result["items"].append({"title": title, "url": f"https://fab.com/listings/{uid}"})
+                items.append(FabItem(title, f"https://fab.com/listings/{uid}"))
+        return end_date, items
+
+
+def _source_version(etag: str | None, last_modified: str | None) -> str:
+    return hashlib.sha256(f"{etag}|{last_modified}".encode()).hexdigest()
 
 
 if __name__ == "__main__":
     scraper = FabScraper()
-    data = scraper.scrape_data()
+    data = scraper.scrape_data().data
     message = scraper.create_message(data)
     print(message)
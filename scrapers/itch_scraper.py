@@ -1,12 +1,16 @@
-import json
-import time
-import urllib.error
-import urllib.request
+import asyncio
+import hashlib
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import timedelta
 from html.parser import HTMLParser
 
+import httpx
 from telegram.helpers import escape_markdown
 
-from scrapers.scraper_interface import ScraperInterface
+from scrapers.models import ItchData, ItchItem
+from scrapers.scraper_interface import NOT_MODIFIED, AsyncScraperInterface, QuickScraper, ScrapeResult, TitleFilter
+from utils.http_cache import CachingTransport, get_http_cache
 from utils.logger import setup_logger
 
 # itch.io has no Cloudflare TLS check, plain HTTP works; ?format=json returns
@@ -24,6 +28,17 @@ PAGE_DELAY_SECONDS = 20
 RATE_LIMIT_RETRIES = 4
 RATE_LIMIT_RETRY_SECONDS = 60
 MAX_PAGES = 150
+# the quick scan between full sweeps; new sales tend to show up near the top of the listing
+QUICK_SCAN_PAGES = 5
+
+
+@dataclass
+class _CrawlStats:
+    """What one crawl saw; per call, the scraper instance is shared by concurrent runs."""
+
+    cache_hits: int = 0
+    bytes_fetched: int = 0
+    validators: "hashlib._Hash" = field(default_factory=hashlib.sha256)
 
 
 class _GameCellParser(HTMLParser):
@@ -55,10 +70,15 @@ class _GameCellParser(HTMLParser):
         self._capture = None
 
 
-class ItchScraper(ScraperInterface):
+class ItchScraper(AsyncScraperInterface, QuickScraper):
+    # up to MAX_PAGES paced pages plus rate-limit backoff
+    scrape_timeout = timedelta(hours=2)
+    data_type = ItchData
+
     def __init__(self) -> None:
         super().__init__()
         self.logger = setup_logger(__name__)
+        self.http_cache = get_http_cache(self.get_scraper_name())
 
     def get_scraper_name(self) -> str:
         return "itch"
@@ -66,65 +86,113 @@ class ItchScraper(ScraperInterface):
     def get_friendly_name(self) -> str:
         return "itch.io"
 
-    def scrape_data(self) -> dict:
+    async def scrape_data(self) -> ScrapeResult:
         self.logger.info("Fetching itch.io on-sale assets...")
+        stats = _CrawlStats()
+        transport = CachingTransport(self.http_cache) if self.http_cache else None
+        async with httpx.AsyncClient(headers=HEADERS, timeout=30, transport=transport) as client:
+            # every page, even when the first ones are 304: a sale ending or starting further down only
+            # changes its own page, and the full sweep is what confirms expirations the quick scan can't see
+            items, page, finished = await self._crawl(client, range(1, MAX_PAGES + 1), stats)
+        if not finished:
+            raise RuntimeError(f"itch.io pagination did not terminate after {MAX_PAGES} pages")
+
+        source_version = stats.validators.hexdigest() if self.http_cache else None
+        if self.http_cache and stats.cache_hits == page:
+            self.logger.info(f"All {page} pages not modified")
+            return ScrapeResult(NOT_MODIFIED, source_version, stats.bytes_fetched)
+
+        # browse order is popularity-based and shuffles between runs; sort so
+        # the manager's comparison only fires on real changes
+        items.sort(key=lambda item: item.id)
+        self.logger.info(f"Done, found {len(items)} free assets on {page} pages")
+        return ScrapeResult(ItchData(tuple(items)), source_version, stats.bytes_fetched)
+
+    async def quick_scrape_data(self, stored: ItchData | None) -> ScrapeResult:
+        self.logger.info(f"Quick scan of the first {QUICK_SCAN_PAGES} itch.io on-sale pages...")
+        stats = _CrawlStats()
+        # no HTTP cache here: its entries have to match what the last full sweep stored
+        async with httpx.AsyncClient(headers=HEADERS, timeout=30) as client:
+            found, page, _ = await self._crawl(client, range(1, QUICK_SCAN_PAGES + 1), stats)
+
+        # fresh titles/urls win, nothing is dropped: only the full sweep can tell an item expired
+        merged = {item.id: item for item in stored.items} if stored else {}
+        added = sum(item.id not in merged for item in found)
+        merged.update((item.id, item) for item in found)
+        self.logger.info(f"Done, {added} new of {len(found)} free assets on {page} pages")
+        items = tuple(sorted(merged.values(), key=lambda item: item.id))
+        return ScrapeResult(ItchData(items), bytes_fetched=stats.bytes_fetched)
+
+    async def _crawl(
+        self, client: httpx.AsyncClient, pages: range, stats: _CrawlStats
+    ) -> tuple[list[ItchItem], int, bool]:
+        """Free items from these pages, the last page fetched, and whether the listing ended within them."""
         items = []
-        for page in range(1, MAX_PAGES + 1):
+        for page in pages:
             if page > 1:
-                time.sleep(PAGE_DELAY_SECONDS)
-            cells = self._fetch_page(page)
+                await asyncio.sleep(PAGE_DELAY_SECONDS)
+            cells = await self._fetch_page(client, page, stats)
             if not cells:
-                break
+                return items, page, True
             items.extend(self._parse_free_items(cells))
-        else:
-            raise RuntimeError(f"itch.io pagination did not terminate after {MAX_PAGES} pages")
+        return items, pages[-1], False
+
+    def create_message(self, data: ItchData) -> str:
+        return self._format_items(f"🦭 *[itch\\.io]({ON_SALE_PAGE_URL}) 100% Off Assets*:", data.items)
+
+    def create_update_message(
+        self, old_data: ItchData | None, new_data: ItchData, title_filter: TitleFilter | None = None
+    ) -> str | None:
+        old_ids = self.get_item_ids(old_data) if old_data else set()
+        new_items = [item for item in new_data.items if item.id not in old_ids]
+        if title_filter:
+            new_items = [item for item in new_items if title_filter(item.title)]
+        if not new_items:
+            return None  # items only expired/removed (or none pass the filter), nothing worth pinging about
+        return self._format_items(f"🦭 *New 100% off assets on [itch\\.io]({ON_SALE_PAGE_URL})*:", new_items)
 
-        # browse order is popularity-based and shuffles between runs; sort so
-        # the manager's dict comparison only fires on real changes
-        items.sort(key=lambda item: item["id"])
-        self.logger.info(f"Done, found {len(items)} free assets on {page} pages")
-        return {"items": items}
+    def invalidate_cache(self) -> None:
+        if self.http_cache:
+            self.http_cache.clear()
 
-    def create_message(self, data: dict) -> str:
-        return self._format_items(f"🦭 *[itch\\.io]({ON_SALE_PAGE_URL}) 100% Off Assets*:", data.get("items", []))
+    def get_item_ids(self, data: ItchData) -> set[str]:
+        return {item.id for item in data.items}
 
-    def create_update_message(self, old_data: dict, new_data: dict) -> str | None:
-        old_ids = {item["id"] for item in old_data.get("items", [])}
-        new_items = [item for item in new_data.get("items", []) if item["id"] not in old_ids]
-        if not new_items:
-            return None  # items only expired/removed, nothing worth pinging about
-        return self._format_items(f"🦭 *New 100% off assets on [itch\\.io]({ON_SALE_PAGE_URL})*:", new_items)
+    def filter_data(self, data: ItchData, title_filter: TitleFilter) -> ItchData | None:
+        items = tuple(item for item in data.items if title_filter(item.title))
+        return ItchData(items) if items else None
 
-    def _fetch_page(self, page: int) -> list[dict]:
-        request = urllib.request.Request(BROWSE_URL.format(page=page), headers=HEADERS)
+    async def _fetch_page(self, client: httpx.AsyncClient, page: int, stats: _CrawlStats | None = None) -> list[dict]:
+        stats = stats or _CrawlStats()
         for attempt in range(RATE_LIMIT_RETRIES + 1):
-            try:
-                with urllib.request.urlopen(request, timeout=30) as response:
-                    body = json.loads(response.read())
+            response = await client.get(BROWSE_URL.format(page=page))
+            if response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                response.raise_for_status()
+                if response.extensions.get("cache_hit"):
+                    stats.cache_hits += 1
+                else:
+                    stats.bytes_fetched += len(response.content)
+                stats.validators.update(
+                    f"{page}|{response.headers.get('ETag')}|{response.headers.get('Last-Modified')}\n".encode()
+                )
+                body = response.json()
                 break
-            except urllib.error.HTTPError as e:
-                if e.code != 429 or attempt == RATE_LIMIT_RETRIES:
-                    raise
-                delay = RATE_LIMIT_RETRY_SECONDS * (attempt + 1)
-                self.logger.warning(f"Rate limited on page {page}, retrying in {delay}s")
-                time.sleep(delay)
+            delay = RATE_LIMIT_RETRY_SECONDS * (attempt + 1)
+            self.logger.warning(f"Rate limited on page {page}, retrying in {delay}s")
+            await asyncio.sleep(delay)
 
         parser = _GameCellParser()
         parser.feed(body.get("content", ""))
         return parser.cells
 
-    def _parse_free_items(self, cells: list[dict]) -> list[dict]:
-        return [
-            {"id": cell["id"], "title": cell["title"], "url": cell["url"]}
-            for cell in cells
-            if cell["sale"].strip() == "-100%"
-        ]
+    def _parse_free_items(self, cells: list[dict]) -> list[ItchItem]:
+        return [ItchItem(cell["id"], cell["title"], cell["url"]) for cell in cells if cell["sale"].strip() == "-100%"]
 
-    def _format_items(self, header: str, items: list[dict]) -> str:
+    def _format_items(self, header: str, items: Sequence[ItchItem]) -> str:
         messages = [header]
         for item in items:
-            title = escape_markdown(item.get("title", "<unknown>"), version=2)
-            url = escape_markdown(item.get("url", "<no-url>"), version=2, entity_type="text_link")
+            title = escape_markdown(item.title or "<unknown>", version=2)
+            url = escape_markdown(item.url or "<no-url>", version=2, entity_type="text_link")
             messages.append(f" \\- [{title}]({url})")
         if not items:
             messages.append(" \\- ⚠️ No free items found")
@@ -133,6 +201,6 @@ class ItchScraper(ScraperInterface):
 
 if __name__ == "__main__":
     scraper = ItchScraper()
-    data = scraper.scrape_data()
+    data = asyncio.run(scraper.scrape_data()).data
     message = scraper.create_message(data)
     print(message)
@@ -0,0 +1,95 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Self
+
+# Typed scraper output. Field names match the documents already stored in scraped_data, so
+# to_doc/from_doc round-trip existing data without a migration.
+
+
+class ScrapedData(ABC):
+    """Base for a scraper's full result; immutable, compared by value."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def to_doc(self) -> dict:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def from_doc(cls, doc: dict) -> Self:
+        pass
+
+    def digest(self) -> str:
+        """Content hash, stable across runs and processes; identifies the state a notification announces."""
+        canonical = json.dumps(self.to_doc(), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class UnityAsset:
+    name: str
+    url: str
+    coupon: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class UnityData(ScrapedData):
+    assets: tuple[UnityAsset, ...] = ()
+
+    def to_doc(self) -> dict:
+        return {"assets": [{"name": a.name, "url": a.url, "coupon": a.coupon} for a in self.assets]}
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> Self:
+        return cls(tuple(UnityAsset(a["name"], a["url"], a.get("coupon")) for a in doc.get("assets", [])))
+
+
+@dataclass(frozen=True, slots=True)
+class FabItem:
+    title: str
+    url: str
+
+
+@dataclass(frozen=True, slots=True)
+class FabData(ScrapedData):
+    end_date: str = ""
+    items: tuple[FabItem, ...] = ()
+
+    def to_doc(self) -> dict:
+        return {"end_date": self.end_date, "items": [{"title": i.title, "url": i.url} for i in self.items]}
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> Self:
+        return cls(doc.get("end_date", ""), tuple(FabItem(i["title"], i["url"]) for i in doc.get("items", [])))
+
+
+@dataclass(frozen=True, slots=True)
+class ItchItem:
+    id: str
+    title: str
+    url: str
+
+
+@dataclass(frozen=True, slots=True)
+class ItchData(ScrapedData):
+    items: tuple[ItchItem, ...] = ()
+
+    def to_doc(self) -> dict:
+        return {"items": [{"id": i.id, "title": i.title, "url": i.url} for i in self.items]}
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> Self:
+        return cls(tuple(ItchItem(i["id"], i["title"], i["url"]) for i in doc.get("items", [])))
+
+
+@dataclass(frozen=True, slots=True)
+class ScraperChange:
+    """A change found by one scraper in a run; old is None on the first scrape."""
+
+    scraper_name: str
+    old: ScrapedData | None
+    new: ScrapedData
+    revision: int = 0  # of the stored state old was loaded from, see DBManager.get_revision
@@ -1,7 +1,44 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from enum import Enum
+from functools import partial
+
+from scrapers.models import ScrapedData
+
+# keeps an item when its title passes, e.g. a user's keyword filter
+TitleFilter = Callable[[str], bool]
+
+
+class NotModified(Enum):
+    NOT_MODIFIED = "not_modified"
+
+
+# scrape_data() result when every source answered 304: nothing changed since the scrape that saw the
+# same source_version, so the manager can skip parsing and diffing
+NOT_MODIFIED = NotModified.NOT_MODIFIED
+
+
+@dataclass(frozen=True)
+class ScrapeResult:
+    """What one scrape call found. Returned rather than kept on the scraper, whose instance is shared by
+    every run, the bot and the dry-run CLI."""
+
+    data: ScrapedData | NotModified
+    # validators of the responses seen, None without an HTTP cache
+    source_version: str | None = None
+    # response bytes pulled in, None if the scraper can't tell (reporting only)
+    bytes_fetched: int | None = None
 
 
 class ScraperInterface(ABC):
+    # ScraperManager gives up on a run after this; sync scrapers keep their worker thread until they return
+    scrape_timeout = timedelta(minutes=10)
+    # model scrape_data returns; what the stored document is loaded back into
+    data_type: type[ScrapedData]
+
     @abstractmethod
     def get_scraper_name(self) -> str:
         pass
@@ -11,13 +48,70 @@ class ScraperInterface(ABC):
         pass
 
     @abstractmethod
-    def scrape_data(self) -> dict:
+    def scrape_data(self) -> ScrapeResult:
         pass
 
     @abstractmethod
-    def create_message(self, data: dict) -> str:
+    def create_message(self, data: ScrapedData) -> str:
         pass
 
-    def create_update_message(self, old_data: dict, new_data: dict) -> str | None:
+    @abstractmethod
+    def get_item_ids(self, data: ScrapedData) -> set[str]:
+        """Stable identity of each free item, for the freebie history."""
+        pass
+
+    def invalidate_cache(self) -> None:
+        """Drops cached responses, so the next scrape_data() fetches and parses everything."""
+        return None
+
+    def load_data(self, doc: dict) -> ScrapedData | None:
+        """Stored document back into this scraper's model; None when nothing was stored yet."""
+        return self.data_type.from_doc(doc) if doc else None
+
+    def create_update_message(
+        self, old_data: ScrapedData | None, new_data: ScrapedData, title_filter: TitleFilter | None = None
+    ) -> str | None:
         """Message to send subscribers when stored data changed; None skips the notification."""
+        if title_filter:
+            new_data = self.filter_data(new_data, title_filter)
+            if new_data is None:
+                return None
         return self.create_message(new_data)
+
+    def filter_data(self, data: ScrapedData, title_filter: TitleFilter) -> ScrapedData | None:
+        """Copy of data keeping only items whose title passes; None when nothing is left."""
+        return data
+
+
+class AsyncScraperInterface(ScraperInterface):
+    """Scraper doing its I/O on the event loop, so a run can be cancelled or timed out cleanly."""
+
+    @abstractmethod
+    async def scrape_data(self) -> ScrapeResult:
+        pass
+
+
+class QuickScraper(ABC):
+    """Mixin for scrapers that can cheaply look for new items between full runs."""
+
+    @abstractmethod
+    def quick_scrape_data(self, stored: ScrapedData | None) -> ScrapeResult:
+        """stored plus items added since, from a partial crawl; removals are left to the next full scrape_data().
+
+        Mustn't use or update the HTTP cache: its validators have to match what the last full sweep stored.
+        The full scrape_data() of a QuickScraper has to cover everything, without stopping early on 304s,
+        since it's what drops the items that expired out of the quick scan's reach.
+        """
+        pass
+
+
+async def run_scrape(
+    scraper: ScraperInterface, quick: bool = False, stored: ScrapedData | None = None
+) -> ScrapeResult:
+    """Scrapes on the event loop or in a worker thread, whichever the scraper supports, within its timeout."""
+    method = partial(scraper.quick_scrape_data, stored) if quick else scraper.scrape_data
+    if isinstance(scraper, AsyncScraperInterface):
+        scrape = method()
+    else:
+        scrape = asyncio.to_thread(method)
+    return await asyncio.wait_for(scrape, timeout=scraper.scrape_timeout.total_seconds())
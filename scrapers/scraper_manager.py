@@ -1,53 +1,262 @@
 import asyncio
+import itertools
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 
-from bot.bot import TelegramBot
+from bot.notifier import Notifier
+from scrapers.models import ScrapedData, ScraperChange
+from scrapers.scraper_interface import NOT_MODIFIED, QuickScraper, ScraperInterface, run_scrape
 from scrapers.scrapers import get_scrapers
+from utils.asset_history import AssetHistory
+from utils.circuit_breaker import CircuitBreaker, breaker_key
 from utils.db_manager import DBManager
+from utils.lease import Lease
 from utils.logger import setup_logger
 
+SCRAPE_INTERVAL = timedelta(days=1)
+# between full scrapes, scrapers that support it look for new items (itch.io: first pages only)
+QUICK_SCRAPE_INTERVAL = timedelta(hours=2)
+
+
+@dataclass(frozen=True)
+class ScrapeRun:
+    """One in-process scrape; every trigger arriving while it runs waits on the same task."""
+
+    run_id: int
+    trigger: str
+    started_at: datetime
+    task: asyncio.Task
+    quick: bool = False
+    force: bool = False
+
+    async def wait(self) -> str | None:
+        """None once the run is done, or why it was skipped; raises what the run raised.
+
+        Every waiter sees a failure: only the trigger that started the run should report it.
+        """
+        # shielded: a waiter giving up (e.g. its handler being cancelled) mustn't abort the run for everyone
+        return await asyncio.shield(self.task)
+
+    def describe(self) -> str:
+        kind = ", ".join([self.trigger] + ["quick"] * self.quick + ["forced"] * self.force)
+        return f"#{self.run_id} ({kind}, started {self.started_at.strftime('%H:%M:%S UTC')})"
+
+
+@dataclass(frozen=True)
+class PendingUpdate:
+    """A detected change waiting for the run's notifications to go out before it's stored."""
+
+    scraper: ScraperInterface
+    change: ScraperChange
+    source_version: str | None
+
 
 class ScraperManager:
-    def __init__(self, bot: TelegramBot, db_manager: DBManager):
+    def __init__(
+        self,
+        notifier: Notifier,
+        db_manager: DBManager,
+        deliver: Callable[[], Awaitable[int]] | None = None,
+    ):
+        """deliver sends what the notifier queued right away (the bot's outbox drain, when in the same process);
+        without it the outbox is left to the bot's periodic drain."""
         self.logger = setup_logger(__name__)
         self.logger.info("Initializing...")
         self.db_manager = db_manager
-        self.bot = bot
+        self.notifier = notifier
+        self.deliver = deliver
 
-        self.scrapers = get_scrapers()
+        # one scraping replica at a time, whichever replica or trigger starts the run
+        self.lease = Lease(db_manager, "scraper")
+        self.history = AssetHistory(db_manager)
+        self.scrapers = get_scrapers()  # same shared instances the bot renders messages with
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self._run_ids = itertools.count(1)
+        self.current_run: ScrapeRun | None = None
         self.logger.info("Done")
 
-    async def process_scrapers(self, force: bool = False):
+    def start_run(
+        self, trigger: str, force: bool = False, min_interval: timedelta | None = None, quick: bool = False
+    ) -> tuple[ScrapeRun, bool]:
+        """Starts a run, or returns the one already in progress; the flag says whether we joined an existing run.
+
+        A joined run keeps the options it was started with. A forced trigger doesn't join a run that isn't
+        forced (it could skip as not due yet): it starts a forced run to follow it instead.
+        """
+        previous = self.current_run
+        if previous and not previous.task.done():
+            if previous.force or not force:
+                self.logger.info(f"Trigger [{trigger}] joined scrape run {previous.describe()}")
+                return previous, True
+            process = self._process_after(previous.task, force, min_interval, quick)
+        else:
+            process = self._process_scrapers(force, min_interval, quick)
+
+        run_id = next(self._run_ids)
+        task = asyncio.create_task(process, name=f"scrape-run-{run_id}")
+        self.current_run = ScrapeRun(run_id, trigger, datetime.now(UTC), task, quick, force)
+        self.logger.info(f"Started scrape run {self.current_run.describe()}")
+        return self.current_run, False
+
+    async def _process_after(self, previous: asyncio.Task, *args) -> str | None:
+        # asyncio.wait: how the previous run ended is for its own trigger to report
+        await asyncio.wait([previous])
+        return await self._process_scrapers(*args)
+
+    async def run_scheduled(self) -> bool:
+        """The periodic check: a full scrape once a day, quick scans in between; False if neither was due."""
+        if await self.process_scrapers(min_interval=SCRAPE_INTERVAL):
+            return True
+        return await self.process_scrapers(min_interval=QUICK_SCRAPE_INTERVAL, quick=True)
+
+    async def process_scrapers(
+        self,
+        force: bool = False,
+        min_interval: timedelta | None = None,
+        trigger: str = "schedule",
+        quick: bool = False,
+    ) -> bool:
+        """Runs all scrapers, or waits for the run in progress; False if skipped.
+
+        quick only runs the scrapers that support it, looking for additions (see quick_scrape_data).
+        A joined run's failure is left to the trigger that started it.
+        """
+        run, joined = self.start_run(trigger, force, min_interval, quick)
+        try:
+            return await run.wait() is None
+        except Exception:
+            if not joined:
+                raise
+            self.logger.info(f"Joined scrape run #{run.run_id} failed, its trigger [{run.trigger}] reports it")
+            return True
+
+    async def _process_scrapers(self, force: bool, min_interval: timedelta | None, quick: bool = False) -> str | None:
+        """Why the run was skipped (disabled, not due yet, or another replica is scraping), None if it ran."""
         if not force and not self.db_manager.is_scraping_enabled():
             self.logger.info("Scraping is disabled, skipping")
-            return
+            return "scraping is disabled"
+
+        async with self.lease.hold() as leader:
+            if not leader:
+                self.logger.info("Another replica is scraping, skipping")
+                return "another replica is scraping"
+            # checked under the lease: replicas' schedules drift apart, the last run is what counts
+            if not force and min_interval and not self._is_due(min_interval, quick):
+                self.logger.info("Last scrape is recent enough, skipping")
+                return "the last scrape is recent enough"
+            await self._run_scrapers(force, quick)
+            return None
 
-        self.logger.info("Processing scrapers...")
-        self.db_manager.set_last_scrape_at()
+    def _is_due(self, min_interval: timedelta, quick: bool = False) -> bool:
+        # a full scrape covers a quick one too
+        times = [self.db_manager.get_last_scrape_at()]
+        if quick:
+            times.append(self.db_manager.get_last_scrape_at(quick=True))
+        times = [last if last.tzinfo else last.replace(tzinfo=UTC) for last in times if last]  # pymongo: naive UTC
+        return not times or datetime.now(UTC) - max(times) >= min_interval
+
+    async def _run_scrapers(self, force: bool = False, quick: bool = False):
+        self.logger.info(f"Processing scrapers{' (quick)' if quick else ''}...")
+        self.db_manager.set_last_scrape_at(quick=quick)
         errors = []
+        updates = []
         for scraper in self.scrapers:
+            if quick and not isinstance(scraper, QuickScraper):
+                continue
             scraper_name = scraper.get_scraper_name()
+            breaker = self._breaker(scraper_name, quick)
+            # a forced (admin) run doubles as a manual probe of open breakers
+            if not force and not breaker.allow():
+                self.logger.info(f"Breaker for [{scraper_name}] is open, skipping")
+                continue
             try:
-                await self._process_scraper(scraper, scraper_name)
+                update = await self._process_scraper(scraper, scraper_name, quick)
             except Exception as e:
                 self.logger.exception(f"Scraper [{scraper_name}] failed")
+                state = breaker.record_failure(e)
+                # the admin heard about it when the breaker opened, failed probes only extend the cooldown
+                if force or state.trips <= 1:
+                    errors.append(e)
+            else:
+                breaker.record_success()
+                if update:
+                    updates.append(update)
+
+        if updates:
+            try:
+                await self._publish(updates)
+            except Exception as e:
+                self.logger.exception("Failed to publish changes")
                 errors.append(e)
         self.logger.info("Scraping complete")
 
         if errors:
             raise ExceptionGroup("Some scrapers failed", errors)
 
-    async def _process_scraper(self, scraper, scraper_name: str):
-        stored_assets = self.db_manager.get_assets(scraper_name)
-        new_assets = await asyncio.to_thread(scraper.scrape_data)
+    def _breaker(self, scraper_name: str, quick: bool) -> CircuitBreaker:
+        key = breaker_key(scraper_name, quick)
+        if key not in self.breakers:
+            interval = QUICK_SCRAPE_INTERVAL if quick else SCRAPE_INTERVAL
+            self.breakers[key] = CircuitBreaker(self.db_manager, key, interval)
+        return self.breakers[key]
+
+    async def _process_scraper(self, scraper, scraper_name: str, quick: bool = False) -> PendingUpdate | None:
+        stored_version = self.db_manager.get_source_version(scraper_name)
+        if quick:
+            stored_assets = scraper.load_data(self.db_manager.get_assets(scraper_name))
+            new_assets = (await run_scrape(scraper, quick=True, stored=stored_assets)).data
+            # the merged state wasn't built from a full set of responses, keep the last sweep's version
+            source_version = stored_version
+        else:
+            result = await run_scrape(scraper)
+            if result.data is NOT_MODIFIED:
+                if result.source_version == stored_version:
+                    self.logger.info(f"Sources for [{scraper_name}] not modified, nothing to parse or diff")
+                    return None
+                # the cache saw responses the stored state wasn't built from (e.g. we died before storing)
+                self.logger.info(f"HTTP cache for [{scraper_name}] is ahead of the stored state, fetching everything")
+                scraper.invalidate_cache()
+                result = await run_scrape(scraper)
+            stored_assets = scraper.load_data(self.db_manager.get_assets(scraper_name))
+            new_assets, source_version = result.data, result.source_version
 
         if new_assets != stored_assets:
             self.logger.info(f"Changes detected for [{scraper_name}]")
-            self.db_manager.update_assets(scraper_name, new_assets)
+            change = ScraperChange(scraper_name, stored_assets, new_assets, self.db_manager.get_revision(scraper_name))
+            return PendingUpdate(scraper, change, source_version)
 
-            message = scraper.create_update_message(stored_assets, new_assets)
-            if message is None:
-                self.logger.info(f"Change for [{scraper_name}] not notification-worthy, skipping")
-                return
-            await self.bot.notify_subscribers(scraper_name, message)
-        else:
-            self.logger.info(f"No changes detected for [{scraper_name}]")
+        self.logger.info(f"No changes detected for [{scraper_name}]")
+        if source_version != stored_version:
+            self.db_manager.set_source_version(scraper_name, source_version)
+        return None
+
+    async def _publish(self, updates: list[PendingUpdate]):
+        # notify before storing: if we die in between, the next run sees the changes again and the
+        # outbox dedups the repeated messages, instead of a change being stored but never announced
+        changes = []
+        for update in updates:
+            change = update.change
+            if update.scraper.create_update_message(change.old, change.new) is None:
+                self.logger.info(f"Change for [{change.scraper_name}] not notification-worthy, skipping")
+            else:
+                changes.append(change)
+        if changes:
+            self.notifier.enqueue_changes(changes)
+            if self.deliver:
+                await self.deliver()
+
+        for update in updates:
+            change = update.change
+            self.db_manager.update_assets(change.scraper_name, change.new.to_doc(), update.source_version)
+            self._record_history(update.scraper, change.scraper_name, change.old, change.new)
+
+    def _record_history(
+        self, scraper: ScraperInterface, scraper_name: str, old_assets: ScrapedData | None, new_assets: ScrapedData
+    ):
+        # analytics only, a failure here shouldn't fail the scrape
+        try:
+            old_ids = scraper.get_item_ids(old_assets) if old_assets else set()
+            self.history.record(scraper_name, old_ids, scraper.get_item_ids(new_assets))
+        except Exception:
+            self.logger.exception(f"Failed to record history for [{scraper_name}]")
@@ -1,8 +1,44 @@
-from scrapers.fab_scraper import FabScraper
-from scrapers.itch_scraper import ItchScraper
+import importlib
+from dataclasses import dataclass
+from functools import cache
+
 from scrapers.scraper_interface import ScraperInterface
-from scrapers.unity_scraper import UnityScraper
+
+
+@dataclass(frozen=True)
+class ScraperInfo:
+    """Registry entry; enough to render menus and subscriptions without importing the scraper."""
+
+    name: str
+    friendly_name: str
+    module: str
+    class_name: str
+
+
+# name is the persistent subscription key, keep in sync with the class' get_scraper_name()
+SCRAPERS = [
+    ScraperInfo("unity", "Unity", "scrapers.unity_scraper", "UnityScraper"),
+    ScraperInfo("unreal_fab_marketplace", "Unreal Engine (Fab Marketplace)", "scrapers.fab_scraper", "FabScraper"),
+    ScraperInfo("itch", "itch.io", "scrapers.itch_scraper", "ItchScraper"),
+]
+_SCRAPERS_BY_NAME = {info.name: info for info in SCRAPERS}
+
+
+def get_scraper_infos() -> list[ScraperInfo]:
+    return list(SCRAPERS)
+
+
+def get_scraper_info(name: str) -> ScraperInfo | None:
+    return _SCRAPERS_BY_NAME.get(name)
+
+
+@cache
+def get_scraper(name: str) -> ScraperInterface:
+    """Shared instance, imported and constructed on first use."""
+    info = _SCRAPERS_BY_NAME[name]
+    scraper_class = getattr(importlib.import_module(info.module), info.class_name)
+    return scraper_class()
 
 
 def get_scrapers() -> list[ScraperInterface]:
-    return [UnityScraper(), FabScraper(), ItchScraper()]
+    return [get_scraper(info.name) for info in SCRAPERS]
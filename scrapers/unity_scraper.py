@@ -1,16 +1,92 @@
+import asyncio
 import re
+import sys
+from dataclasses import replace
+from functools import cache
+from html.parser import HTMLParser
+from urllib.parse import urljoin
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+import httpx
 from telegram.helpers import escape_markdown
 
-from scrapers.scraper_interface import ScraperInterface
+from scrapers.models import UnityAsset, UnityData
+from scrapers.scraper_interface import AsyncScraperInterface, ScrapeResult, TitleFilter
 from utils.logger import setup_logger
-from utils.selenium_driver import get_driver
 
+PUBLISHER_SALE_URL = "https://assetstore.unity.com/publisher-sale"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    " (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+COUPON_PATTERN = re.compile(r"coupon code (\S+)", re.IGNORECASE)
+
+
+class _CalloutParser(HTMLParser):
+    """Extracts {name, url, coupon_text} from the server-rendered section[data-type="CalloutSlim"] blocks."""
+
+    def __init__(self):
+        super().__init__()
+        self.callouts = []
+        self._callout = None
+        self._section_depth = 0  # nesting of <section> inside the current callout
+        self._capture = None  # "name" | "coupon_text" while reading text into that field
+        self._capture_tag = None
+        self._capture_depth = 0  # nesting of _capture_tag, e.g. a <span> inside the coupon span
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "section":
+            if self._callout is not None:
+                self._section_depth += 1
+            elif attrs.get("data-type") == "CalloutSlim":
+                self._callout = {"name": "", "url": "", "coupon_text": ""}
+                self.callouts.append(self._callout)
+                self._section_depth = 1
+            return
+        if self._callout is None:
+            return
+        if self._capture:
+            self._capture_depth += tag == self._capture_tag
+        elif tag == "h2" and not self._callout["name"]:
+            self._start_capture("name", tag)
+        elif tag == "span" and "body" in (attrs.get("class") or "").split() and not self._callout["coupon_text"]:
+            self._start_capture("coupon_text", tag)
+        if tag == "a" and not self._callout["url"]:
+            self._callout["url"] = attrs.get("href") or ""
+
+    def handle_data(self, data):
+        if self._capture:
+            self._callout[self._capture] += data
+
+    def handle_endtag(self, tag):
+        if self._callout is None:
+            return
+        if self._capture and tag == self._capture_tag:
+            self._capture_depth -= 1
+            if not self._capture_depth:
+                self._capture = None
+        elif tag == "section":
+            self._section_depth -= 1
+            if not self._section_depth:
+                self._callout = None
+
+    def _start_capture(self, field, tag):
+        self._capture, self._capture_tag, self._capture_depth = field, tag, 1
+
+
+@cache
+def _by():
+    """selenium's By, imported on first use like the rest of selenium."""
+    from selenium.webdriver.common.by import By
+
+    return By
+
+
+class UnityScraper(AsyncScraperInterface):
+    data_type = UnityData
 
-class UnityScraper(ScraperInterface):
     def __init__(self) -> None:
         super().__init__()
         self.logger = setup_logger(__name__)
@@ -21,45 +97,92 @@ class UnityScraper(ScraperInterface):
     def get_friendly_name(self) -> str:
         return "Unity"
 
-    def scrape_data(self) -> dict:
+    async def scrape_data(self) -> ScrapeResult:
         self.logger.info("Fetching Unity assets...")
+        try:
+            result = await self._fetch_server_rendered()
+        except (httpx.HTTPError, ValueError) as e:
+            self.logger.warning(f"Plain HTTP fetch failed ({e}), falling back to the browser")
+        else:
+            self.logger.info(f"Done, found {len(result.data.assets)} assets")
+            return result
+        # the browser session blocks, keep it off the event loop
+        return ScrapeResult(await asyncio.to_thread(self._scrape_with_selenium))
+
+    async def _fetch_server_rendered(self) -> ScrapeResult:
+        """The callouts from the page's server-rendered HTML; ValueError if they don't look right."""
+        async with httpx.AsyncClient(headers=HEADERS, timeout=30, follow_redirects=True) as client:
+            response = await client.get(PUBLISHER_SALE_URL)
+            response.raise_for_status()
+        return ScrapeResult(self._parse_callouts(response.text), bytes_fetched=len(response.content))
+
+    def _parse_callouts(self, html: str) -> UnityData:
+        parser = _CalloutParser()
+        parser.feed(html)
+        assets = []
+        for callout in parser.callouts:
+            name = " ".join(callout["name"].split())
+            if not name or not callout["url"]:
+                raise ValueError(f"Incomplete callout in server-rendered page: {callout}")
+            coupon_match = COUPON_PATTERN.search(" ".join(callout["coupon_text"].split()))
+            coupon = coupon_match.group(1) if coupon_match else None
+            assets.append(UnityAsset(name, urljoin(PUBLISHER_SALE_URL, callout["url"]), coupon))
+        # the sale always has at least one asset; none means the page is client-rendered or changed layout
+        if not assets:
+            raise ValueError("No CalloutSlim sections in server-rendered page")
+        return UnityData(tuple(assets))
+
+    def _scrape_with_selenium(self) -> UnityData:
+        # selenium is only needed once we actually scrape, bot-only processes never import it
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        from utils.selenium_driver import get_driver
+
         driver = get_driver()
-        driver.get("https://assetstore.unity.com/publisher-sale")
+        driver.get(PUBLISHER_SALE_URL)
 
         assets = []
         try:
             wait = WebDriverWait(driver, 10)
             sections = wait.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'section[data-type="CalloutSlim"]'))
+                EC.presence_of_all_elements_located((_by().CSS_SELECTOR, 'section[data-type="CalloutSlim"]'))
             )
             for section in sections:
                 name = self._scrape_asset_name(section)
                 url = self._scrape_asset_url(section)
                 coupon_code = self._scrape_asset_coupon(section)
-                assets.append({"name": name, "url": url, "coupon": coupon_code})
+                assets.append(UnityAsset(name, url, coupon_code))
         finally:
             driver.quit()
 
         self.logger.info(f"Done, found {len(assets)} assets")
-        return {"assets": assets}
+        return UnityData(tuple(assets))
 
-    def create_message(self, data: dict) -> str:
+    def create_message(self, data: UnityData) -> str:
         messages = []
-        for asset in data.get("assets", []):
-            name = escape_markdown(asset.get("name", "<unknown>"), version=2)
-            url = escape_markdown(asset.get("url", "<no-url>"), version=2, entity_type="text_link")
-            coupon = escape_markdown(asset.get("coupon") or "No coupon available", version=2, entity_type="code")
+        for asset in data.assets:
+            name = escape_markdown(asset.name or "<unknown>", version=2)
+            url = escape_markdown(asset.url or "<no-url>", version=2, entity_type="text_link")
+            coupon = escape_markdown(asset.coupon or "No coupon available", version=2, entity_type="code")
             messages.append(f" \\- *\\[Coupon: `{coupon}`\\]* [{name}]({url})")
 
-        if not data.get("assets"):
+        if not data.assets:
             messages.append(" \\- ⚠️ No free items found")
 
         return "🦭 *Unity Free Assets*:\n" + "\n".join(messages)
 
+    def get_item_ids(self, data: UnityData) -> set[str]:
+        return {asset.url for asset in data.assets}
+
+    def filter_data(self, data: UnityData, title_filter: TitleFilter) -> UnityData | None:
+        assets = tuple(asset for asset in data.assets if title_filter(asset.name))
+        return replace(data, assets=assets) if assets else None
+
     def _scrape_asset_name(self, section):
         name = "<error>"
         try:
-            name = section.find_element(By.TAG_NAME, "h2").text
+            name = section.find_element(_by().TAG_NAME, "h2").text
         except Exception as e:
             self.logger.error(f"Error extracting name: {e}")
         return name
@@ -67,7 +190,7 @@ class UnityScraper(ScraperInterface):
     def _scrape_asset_url(self, section):
         url = "<error>"
         try:
-            url = section.find_element(By.TAG_NAME, "a").get_attribute("href")
+            url = section.find_element(_by().TAG_NAME, "a").get_attribute("href")
         except Exception as e:
             self.logger.error(f"Error extracting URL: {e}")
         return url
@@ -75,17 +198,28 @@ class UnityScraper(ScraperInterface):
     def _scrape_asset_coupon(self, section):
         coupon_code = "<error>"
         try:
-            coupon_code_element = section.find_element(By.CSS_SELECTOR, "span.body")
+            coupon_code_element = section.find_element(_by().CSS_SELECTOR, "span.body")
             coupon_code_text = coupon_code_element.text
-            coupon_code_match = re.search(r"coupon code (\S+)", coupon_code_text, re.IGNORECASE)
+            coupon_code_match = COUPON_PATTERN.search(coupon_code_text)
             coupon_code = coupon_code_match.group(1) if coupon_code_match else None
         except Exception as e:
             self.logger.error(f"Error extracting coupon code: {e}")
         return coupon_code
 
 
+def _record(path: str) -> None:
+    """Saves the live publisher-sale page, to refresh the test fixture."""
+    response = httpx.get(PUBLISHER_SALE_URL, headers=HEADERS, timeout=30, follow_redirects=True)
+    response.raise_for_status()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(response.text)
+
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["--record"]:
+        _record(sys.argv[2])
+        sys.exit()
     scraper = UnityScraper()
-    data = scraper.scrape_data()
+    data = asyncio.run(scraper.scrape_data()).data
     message = scraper.create_message(data)
     print(message)
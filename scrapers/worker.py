@@ -0,0 +1,79 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from bot.notifier import Notifier
+from scrapers.scraper_manager import ScraperManager
+from utils.db_manager import DBManager
+from utils.logger import setup_logger
+
+# how soon an admin's "Scrape now" is picked up
+REQUEST_POLL_INTERVAL = timedelta(seconds=15)
+
+
+class ScrapeWorker:
+    """Scrapes in its own process (ROLE=worker), so the bot's event loop never shares the interpreter with it.
+
+    Runs the scheduled check and the admin's "Scrape now" requests, which the bot leaves in scrape_requests.
+    Notifications and the admin's reports go through the outbox, which the bot drains.
+    """
+
+    def __init__(self, scraper_manager: ScraperManager, db_manager: DBManager, notifier: Notifier):
+        self.logger = setup_logger(__name__)
+        self.scraper_manager = scraper_manager
+        self.db_manager = db_manager
+        self.notifier = notifier
+        self._tasks: set[asyncio.Task] = set()
+
+    async def run(self, check_interval: timedelta):
+        self.logger.info("Worker started")
+        self._spawn(self._schedule(check_interval))
+        try:
+            while True:
+                try:
+                    while request := self.db_manager.claim_scrape_request(self.scraper_manager.lease.holder):
+                        self._spawn(self._serve_request(request))
+                except Exception:
+                    # e.g. MongoDB failing over; the schedule keeps running, try again on the next poll
+                    self.logger.exception("Failed to claim scrape requests")
+                await asyncio.sleep(REQUEST_POLL_INTERVAL.total_seconds())
+        finally:
+            for task in self._tasks:
+                task.cancel()
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _schedule(self, check_interval: timedelta):
+        while True:
+            try:
+                await self.scraper_manager.run_scheduled()
+            except Exception as e:
+                self.logger.exception("Scheduled scrape failed")
+                # the bot's error handler would have told the admin, do the same through the outbox
+                now = datetime.now(UTC)
+                self.notifier.notify_admin(
+                    f"worker-error:{now.isoformat()}", f"⚠️ Scheduled scrape failed at {now:%H:%M UTC}: {e!r}"[:4000]
+                )
+            await asyncio.sleep(check_interval.total_seconds())
+
+    async def _serve_request(self, request: dict):
+        # several requests during one run join it, like repeated presses in the bot
+        run, joined = self.scraper_manager.start_run("admin", force=True)
+        try:
+            skipped = await run.wait()
+        except Exception as e:
+            if joined:
+                # the trigger that started the run reports the error
+                result = f"⚠️ Scrape run #{run.run_id} failed, see its error report"
+            else:
+                self.logger.exception(f"Requested scrape run #{run.run_id} failed")
+                result = f"⚠️ Scrape run #{run.run_id} failed: {e!r}"[:4000]
+        else:
+            if skipped:
+                result = f"⏭ Scrape run #{run.run_id} was skipped: {skipped}"
+            else:
+                result = f"✅ Scrape run #{run.run_id} finished"
+        self.db_manager.finish_scrape_request(request["_id"], result)
+        self.notifier.notify_admin(f"scrape_request:{request['_id']}", result)
@@ -0,0 +1,49 @@
+from datetime import UTC, datetime, timedelta
+
+from utils.asset_history import KEYFRAME_INTERVAL, ItemFreeStats, free_periods, make_history_entry, replay
+
+T0 = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def test_first_entry_is_a_keyframe():
+    entry = make_history_entry("itch", set(), {"b", "a"}, T0, last_keyframe_at=None, deltas_since_keyframe=0)
+
+    assert entry["kind"] == "keyframe"
+    assert entry["ids"] == ["a", "b"]
+
+
+def test_delta_between_keyframes():
+    entry = make_history_entry("itch", {"a", "b"}, {"b", "c"}, T0 + timedelta(days=1), T0, deltas_since_keyframe=3)
+
+    assert entry["kind"] == "delta"
+    assert entry["added"] == ["c"]
+    assert entry["removed"] == ["a"]
+
+
+def test_no_entry_without_changes_and_keyframe_when_due():
+    assert make_history_entry("itch", {"a"}, {"a"}, T0 + timedelta(days=1), T0, 0) is None
+
+    due = make_history_entry("itch", {"a"}, {"a"}, T0 + KEYFRAME_INTERVAL, T0, 0)
+    assert due["kind"] == "keyframe"
+
+
+def test_replay_reconstructs_state():
+    keyframe = {"ids": ["a", "b"]}
+    deltas = [{"added": ["c"], "removed": ["a"]}, {"added": ["a"], "removed": ["b"]}]
+
+    assert replay(keyframe, deltas) == {"a", "c"}
+
+
+def test_free_periods_and_stats():
+    events = [
+        (T0, True),  # keyframe, already free
+        (T0 + timedelta(days=1), False),
+        (T0 + timedelta(days=7), False),  # keyframe, still not free
+        (T0 + timedelta(days=10), True),
+    ]
+
+    stats = ItemFreeStats(free_periods(events))
+
+    assert stats.periods == [(T0, T0 + timedelta(days=1)), (T0 + timedelta(days=10), None)]
+    assert stats.times_free == 2
+    assert stats.total_free(now=T0 + timedelta(days=12)) == timedelta(days=3)
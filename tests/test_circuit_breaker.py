@@ -0,0 +1,49 @@
+from datetime import UTC, datetime, timedelta
+
+from utils.circuit_breaker import FAILURE_THRESHOLD, MAX_COOLDOWN_RUNS, BreakerState, cooldown, record_failure
+
+NOW = datetime(2026, 1, 1, tzinfo=UTC)
+DAILY = timedelta(days=1)
+
+
+def fail_times(state: BreakerState, times: int, now: datetime = NOW) -> BreakerState:
+    for _ in range(times):
+        state = record_failure(state, now, "TimeoutError: page did not load", DAILY)
+    return state
+
+
+def test_opens_after_threshold():
+    state = fail_times(BreakerState(), FAILURE_THRESHOLD - 1)
+    assert state.status(NOW) == "closed"
+
+    state = fail_times(state, 1)
+    assert state.status(NOW) == "open"
+    assert state.open_until == NOW + cooldown(1, DAILY)
+    # the next daily run is skipped
+    assert state.status(NOW + DAILY - timedelta(minutes=1)) == "open"
+    assert state.last_error == "TimeoutError: page did not load"
+
+
+def test_failed_probe_reopens_with_longer_cooldown():
+    state = fail_times(BreakerState(), FAILURE_THRESHOLD)
+    probe_at = state.open_until + timedelta(minutes=1)
+    assert state.status(probe_at) == "half-open"
+
+    reopened = fail_times(state, 1, now=probe_at)
+
+    assert reopened.status(probe_at) == "open"
+    assert reopened.open_until - probe_at == 2 * (state.open_until - NOW)
+
+
+def test_cooldown_scales_with_interval_and_is_capped():
+    assert cooldown(1, DAILY) < cooldown(2, DAILY) < cooldown(3, DAILY)
+    assert cooldown(2, timedelta(hours=2)) == timedelta(hours=4)
+    assert cooldown(50, DAILY) == MAX_COOLDOWN_RUNS * DAILY
+
+
+def test_doc_round_trip_with_naive_mongo_datetime():
+    state = fail_times(BreakerState(), FAILURE_THRESHOLD)
+    doc = state.to_doc() | {"open_until": state.open_until.replace(tzinfo=None)}
+
+    assert BreakerState.from_doc(doc) == state
+    assert BreakerState.from_doc(None) == BreakerState()
@@ -0,0 +1,23 @@
+from bot.digest import SECTION_SEPARATOR, chunk_sections
+
+
+def test_sections_share_a_message_while_they_fit():
+    assert chunk_sections(["a" * 10, "b" * 10, "c" * 10], limit=30) == [
+        "a" * 10 + SECTION_SEPARATOR + "b" * 10,
+        "c" * 10,
+    ]
+    assert chunk_sections([]) == []
+
+
+def test_long_section_is_split_between_lines():
+    section = "\n".join(f"line {i}" for i in range(10))
+    chunks = chunk_sections(["head", section], limit=20)
+
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert "\n".join(chunks).replace(SECTION_SEPARATOR, "\n") == "head\n" + section
+
+
+def test_overlong_line_is_cut_without_orphaning_an_escape():
+    chunks = chunk_sections(["abcd\\.efgh"], limit=5)
+
+    assert chunks == ["abcd", "\\.efg", "h"]
@@ -1,4 +1,8 @@
-from scrapers.fab_scraper import FabScraper
+import json
+from types import SimpleNamespace
+
+from scrapers.fab_scraper import SAME_ORIGIN_URL, FabScraper
+from scrapers.models import FabData, FabItem
 
 # Trimmed-down copy of the real /i/layouts/homepage response shape
 HOMEPAGE = {
@@ -24,25 +28,24 @@ HOMEPAGE = {
 def test_parses_free_blade():
     result = FabScraper()._parse_free_items(HOMEPAGE)
 
-    assert result["end_date"] == "Until July 14 at 9:59 AM ET"
-    assert result["items"] == [
-        {"title": "ALL ITEMS", "url": "https://www.fab.com/limited-time-free"},
-        {"title": "Stylized Village", "url": "https://fab.com/listings/uid-1"},
-        {"title": "Pack of tree ents", "url": "https://fab.com/listings/uid-2"},
-    ]
+    assert result.end_date == "Until July 14 at 9:59 AM ET"
+    assert result.items == (
+        FabItem("ALL ITEMS", "https://www.fab.com/limited-time-free"),
+        FabItem("Stylized Village", "https://fab.com/listings/uid-1"),
+        FabItem("Pack of tree ents", "https://fab.com/listings/uid-2"),
+    )
 
 
 def test_empty_homepage():
     result = FabScraper()._parse_free_items({})
 
-    assert result == {"end_date": "", "items": []}
+    assert result == FabData()
 
 
 def test_create_message_escapes_markdown():
-    data = {
-        "end_date": "Until July 14 at 9:59 AM ET",
-        "items": [{"title": "Village (Stylized!)", "url": "https://fab.com/listings/uid-1_(x)"}],
-    }
+    data = FabData(
+        "Until July 14 at 9:59 AM ET", (FabItem("Village (Stylized!)", "https://fab.com/listings/uid-1_(x)"),)
+    )
 
     message = FabScraper().create_message(data)
 
@@ -52,6 +55,65 @@ def test_create_message_escapes_markdown():
 
 
 def test_create_message_no_items():
-    message = FabScraper().create_message({"end_date": "", "items": []})
+    message = FabScraper().create_message(FabData())
 
     assert "No free items found" in message
+
+
+def test_filter_keeps_all_items_link_only_with_matches():
+    data = FabScraper()._parse_free_items(HOMEPAGE)
+
+    filtered = FabScraper().filter_data(data, lambda title: "Village" in title)
+
+    assert [item.title for item in filtered.items] == ["ALL ITEMS", "Stylized Village"]
+    assert filtered.end_date == data.end_date
+    assert FabScraper().filter_data(data, lambda title: False) is None
+
+
+class FakeDriver:
+    def __init__(self, script_result):
+        self.script_result = script_result
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, *args):
+        return self.script_result
+
+    def find_element(self, by, value):
+        return SimpleNamespace(text=json.dumps(HOMEPAGE))
+
+
+def test_trimmed_layout_parses_like_full_homepage():
+    # what the in-browser script sends back for HOMEPAGE
+    trimmed = {
+        "carousel": [HOMEPAGE["carousel"][0]],
+        "blades": [
+            {
+                "title": HOMEPAGE["blades"][1]["title"],
+                "tiles": [
+                    {"listing": {"uid": t["listing"].get("uid"), "title": t["listing"]["title"]}}
+                    for t in HOMEPAGE["blades"][1]["tiles"]
+                ],
+            }
+        ],
+    }
+    scraper = FabScraper()
+    driver = FakeDriver(trimmed)
+
+    result = scraper._fetch_free_layout(driver)
+
+    assert driver.visited == [SAME_ORIGIN_URL]
+    assert result.data == scraper._parse_free_items(HOMEPAGE)
+
+
+def test_falls_back_to_full_homepage_when_script_fails():
+    scraper = FabScraper()
+    driver = FakeDriver({"error": "TypeError: Failed to fetch"})
+
+    assert scraper._fetch_free_layout(driver) is None
+    assert scraper._fetch_homepage(driver)[0] == HOMEPAGE
@@ -0,0 +1,45 @@
+import asyncio
+
+from bot.health import LIVENESS_PATH, READINESS_PATH, HealthServer, start_health_server
+
+
+async def get_status(port: int, path: str) -> str:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    writer.close()
+    await writer.wait_closed()
+    return status_line.decode().split(" ", 1)[1].strip()
+
+
+def probe(ready: bool) -> list[str]:
+    async def ready_check():
+        return ready
+
+    async def main():
+        server = HealthServer("127.0.0.1", 0, ready_check)
+        await server.start()
+        try:
+            return [await get_status(server.port, path) for path in (LIVENESS_PATH, READINESS_PATH, "/nope")]
+        finally:
+            await server.stop()
+
+    return asyncio.run(main())
+
+
+def test_ready():
+    assert probe(ready=True) == ["200 OK", "200 OK", "404 Not Found"]
+
+
+def test_not_ready_is_still_alive():
+    assert probe(ready=False) == ["200 OK", "503 Service Unavailable", "404 Not Found"]
+
+
+def test_disabled_without_health_port(monkeypatch):
+    monkeypatch.delenv("HEALTH_PORT", raising=False)
+
+    async def ready_check():
+        return True
+
+    assert asyncio.run(start_health_server(ready_check)) is None
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from utils.http_cache import CachingTransport, HttpCache
+
+
+class ValidatorHandler(BaseHTTPRequestHandler):
+    """Serves /<name> with an ETag derived from the server's current version, honoring If-None-Match."""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        etag = f'"{self.server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = f"{self.path} v{self.server.version}".encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ValidatorHandler)
+    server.version, server.requests = 1, []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(cache: HttpCache, url: str) -> httpx.Response:
+    async def get():
+        async with httpx.AsyncClient(transport=CachingTransport(cache)) as client:
+            return await client.get(url)
+
+    return asyncio.run(get())
+
+
+def test_revalidates_and_serves_304_from_disk(server, tmp_path):
+    cache = HttpCache(tmp_path)
+    url = f"http://127.0.0.1:{server.server_port}/page"
+
+    first = fetch(cache, url)
+    second = fetch(cache, url)
+    server.version = 2
+    third = fetch(cache, url)
+
+    assert first.text == second.text == "/page v1"
+    assert "cache_hit" not in first.extensions
+    assert second.extensions["cache_hit"] is True
+    assert server.requests[1]["If-None-Match"] == '"1"'
+    assert third.text == "/page v2" and "cache_hit" not in third.extensions
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_evicts_least_recently_used_beyond_max_bytes(tmp_path):
+    cache = HttpCache(tmp_path, max_bytes=25)
+
+    cache.store("a", '"1"', None, b"x" * 10)
+    cache.store("b", '"1"', None, b"x" * 10)
+    cache.touch("a")
+    cache.store("c", '"1"', None, b"x" * 10)
+
+    assert cache.lookup("a") and cache.lookup("c")
+    assert cache.lookup("b") is None
+
+
+def test_skips_responses_without_validators(tmp_path):
+    cache = HttpCache(tmp_path)
+
+    cache.store("a", None, None, b"body")
+
+    assert cache.lookup("a") is None
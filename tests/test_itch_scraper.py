@@ -1,4 +1,11 @@
-from scrapers.itch_scraper import ItchScraper, _GameCellParser
+import asyncio
+
+import httpx
+
+from scrapers.itch_scraper import BROWSE_URL, ItchScraper, _GameCellParser
+from scrapers.models import ItchData, ItchItem
+from scrapers.scraper_interface import NOT_MODIFIED
+from utils.http_cache import HttpCache
 
 # Trimmed-down copy of a real browse ?format=json "content" cell
 CELL_TEMPLATE = """
@@ -17,6 +24,9 @@ CELL_TEMPLATE = """
 """
 
 
+FREE_CELL = {"id": "1", "url": "https://a.itch.io/free", "title": "Free Pack", "sale": "-100%"}
+
+
 def make_content(*cells: dict) -> str:
     return "".join(CELL_TEMPLATE.format(**cell) for cell in cells)
 
@@ -44,17 +54,12 @@ def test_keeps_only_full_discounts():
 
     items = ItchScraper()._parse_free_items(cells)
 
-    assert items == [{"id": "1", "title": "Free", "url": "u1"}]
+    assert items == [ItchItem("1", "Free", "u1")]
 
 
 def test_update_message_only_lists_new_items():
-    old = {"items": [{"id": "1", "title": "Old", "url": "u1"}]}
-    new = {
-        "items": [
-            {"id": "1", "title": "Old", "url": "u1"},
-            {"id": "2", "title": "Fresh", "url": "u2"},
-        ]
-    }
+    old = ItchData((ItchItem("1", "Old", "u1"),))
+    new = ItchData((ItchItem("1", "Old", "u1"), ItchItem("2", "Fresh", "u2")))
 
     message = ItchScraper().create_update_message(old, new)
 
@@ -63,14 +68,14 @@ def test_update_message_only_lists_new_items():
 
 
 def test_update_message_none_when_items_only_removed():
-    old = {"items": [{"id": "1", "title": "Gone", "url": "u1"}]}
-    new = {"items": []}
+    old = ItchData((ItchItem("1", "Gone", "u1"),))
+    new = ItchData()
 
     assert ItchScraper().create_update_message(old, new) is None
 
 
 def test_create_message_escapes_markdown():
-    data = {"items": [{"id": "1", "title": "Pack (Cool!)", "url": "https://a.itch.io/pack_(x)"}]}
+    data = ItchData((ItchItem("1", "Pack (Cool!)", "https://a.itch.io/pack_(x)"),))
 
     message = ItchScraper().create_message(data)
 
@@ -89,20 +94,129 @@ def test_scrape_walks_pages_until_empty_and_sorts(monkeypatch):
         3: [],
     }
     scraper = ItchScraper()
-    monkeypatch.setattr(scraper, "_fetch_page", lambda page: pages[page])
-    monkeypatch.setattr("scrapers.itch_scraper.time.sleep", lambda s: None)
 
-    data = scraper.scrape_data()
+    async def fetch_page(client, page, stats):
+        return pages[page]
 
-    assert data == {
-        "items": [
-            {"id": "3", "title": "A", "url": "u3"},
-            {"id": "9", "title": "B", "url": "u9"},
-        ]
-    }
+    monkeypatch.setattr(scraper, "_fetch_page", fetch_page)
+    monkeypatch.setattr("scrapers.itch_scraper.PAGE_DELAY_SECONDS", 0)
+
+    data = asyncio.run(scraper.scrape_data()).data
+
+    assert data == ItchData((ItchItem("3", "A", "u3"), ItchItem("9", "B", "u9")))
+
+
+def test_scrape_sees_changes_below_unmodified_first_pages(monkeypatch, tmp_path):
+    fetched = []
+    pages = {page: [{"id": str(page), "title": "T", "url": "u", "sale": "-100%"}] for page in range(1, 7)}
+    pages[6] = []  # end of the listing
+    scraper = ItchScraper()
+    scraper.http_cache = HttpCache(tmp_path)
+
+    async def fetch_page(client, page, stats):
+        fetched.append(page)
+        if page <= 3:
+            stats.cache_hits += 1  # 304s
+        return pages[page]
+
+    monkeypatch.setattr(scraper, "_fetch_page", fetch_page)
+    monkeypatch.setattr("scrapers.itch_scraper.PAGE_DELAY_SECONDS", 0)
+
+    result = asyncio.run(scraper.scrape_data())
+
+    assert fetched == [1, 2, 3, 4, 5, 6]
+    assert [item.id for item in result.data.items] == ["1", "2", "3", "4", "5"]
+
+
+def test_scrape_not_modified_only_when_every_page_is(monkeypatch, tmp_path):
+    scraper = ItchScraper()
+    scraper.http_cache = HttpCache(tmp_path)
+
+    async def fetch_page(client, page, stats):
+        stats.cache_hits += 1
+        return [{"id": str(page), "title": "T", "url": "u", "sale": "-100%"}] if page < 8 else []
+
+    monkeypatch.setattr(scraper, "_fetch_page", fetch_page)
+    monkeypatch.setattr("scrapers.itch_scraper.PAGE_DELAY_SECONDS", 0)
+
+    assert asyncio.run(scraper.scrape_data()).data is NOT_MODIFIED
 
 
 def test_create_message_no_items():
-    message = ItchScraper().create_message({"items": []})
+    message = ItchScraper().create_message(ItchData())
 
     assert "No free items found" in message
+
+
+def test_fetch_page_retries_rate_limit(monkeypatch):
+    responses = iter([httpx.Response(429), httpx.Response(200, json={"content": make_content(FREE_CELL)})])
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses)))
+    monkeypatch.setattr("scrapers.itch_scraper.RATE_LIMIT_RETRY_SECONDS", 0)
+
+    cells = asyncio.run(ItchScraper()._fetch_page(client, 1))
+
+    assert [cell["id"] for cell in cells] == ["1"]
+
+
+def test_update_message_applies_title_filter():
+    old = None  # first run, nothing stored yet
+    new = ItchData((ItchItem("1", "Pixel Trees", "u1"), ItchItem("2", "Sounds", "u2")))
+    scraper = ItchScraper()
+
+    message = scraper.create_update_message(old, new, title_filter=lambda title: "Pixel" in title)
+
+    assert "Pixel Trees" in message
+    assert "Sounds" not in message
+    assert scraper.create_update_message(old, new, title_filter=lambda title: False) is None
+
+
+def test_quick_scrape_merges_first_pages_into_stored(monkeypatch):
+    stored = ItchData((ItchItem("1", "Still free", "u1"), ItchItem("2", "Maybe expired", "u2")))
+    pages = {
+        1: [
+            {"id": "3", "title": "New", "url": "u3", "sale": "-100%"},
+            {"id": "1", "title": "Renamed", "url": "u1", "sale": "-100%"},
+        ],
+        2: [{"id": "4", "title": "Deep", "url": "u4", "sale": "-100%"}],
+    }
+    scraper = ItchScraper()
+
+    async def fetch_page(client, page, stats):
+        return pages[page]
+
+    monkeypatch.setattr(scraper, "_fetch_page", fetch_page)
+    monkeypatch.setattr("scrapers.itch_scraper.PAGE_DELAY_SECONDS", 0)
+    monkeypatch.setattr("scrapers.itch_scraper.QUICK_SCAN_PAGES", 1)
+
+    merged = asyncio.run(scraper.quick_scrape_data(stored)).data
+
+    assert merged == ItchData(
+        (ItchItem("1", "Renamed", "u1"), ItchItem("2", "Maybe expired", "u2"), ItchItem("3", "New", "u3"))
+    )
+    message = scraper.create_update_message(stored, merged)
+    assert "New" in message and "Renamed" not in message
+
+
+def test_quick_scrape_leaves_http_cache_alone(monkeypatch, tmp_path):
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        return httpx.Response(200, json={"content": make_content(FREE_CELL)}, headers={"ETag": '"new"'})
+
+    real_client = httpx.AsyncClient
+
+    def make_client(**kwargs):
+        assert kwargs.get("transport") is None  # no CachingTransport
+        return real_client(**kwargs | {"transport": httpx.MockTransport(respond)})
+
+    monkeypatch.setattr("scrapers.itch_scraper.httpx.AsyncClient", make_client)
+    monkeypatch.setattr("scrapers.itch_scraper.QUICK_SCAN_PAGES", 1)
+    scraper = ItchScraper()
+    scraper.http_cache = HttpCache(tmp_path)
+    scraper.http_cache.store(BROWSE_URL.format(page=1), '"swept"', None, b"{}")
+
+    asyncio.run(scraper.quick_scrape_data(None))
+
+    assert "If-None-Match" not in requests[0].headers
+    assert scraper.http_cache.lookup(BROWSE_URL.format(page=1)).etag == '"swept"'
@@ -0,0 +1,47 @@
+from utils.keyword_matcher import KeywordFilter, KeywordFilterIndex, KeywordMatcher
+
+
+def test_finds_overlapping_keywords_case_insensitively():
+    matcher = KeywordMatcher(["pixel", "pixel art", "art pack", "Low Poly"])
+
+    assert matcher.find("Retro PIXEL ART PACK") == {"pixel", "pixel art", "art pack"}
+    assert matcher.find("low poly: forest") == {"low poly"}
+    assert matcher.find("") == frozenset()
+
+
+def test_matches_at_word_start_only():
+    matcher = KeywordMatcher(["ui", "sound"])
+
+    assert matcher.find("Build a guitar") == frozenset()
+    assert matcher.find("UI kit with sounds") == {"ui", "sound"}
+
+
+def test_empty_matcher():
+    assert KeywordMatcher([]).find("anything") == frozenset()
+
+
+def test_filter_index_include_and_exclude():
+    pixel = KeywordFilter(include=frozenset({"pixel"}))
+    no_sounds = KeywordFilter(exclude=frozenset({"sound"}))
+    pixel_no_ui = KeywordFilter(include=frozenset({"pixel"}), exclude=frozenset({"ui"}))
+    index = KeywordFilterIndex([pixel, no_sounds, pixel_no_ui])
+
+    assert index.allows(pixel, "Pixel Forest Tileset")
+    assert not index.allows(pixel, "Low Poly Trees")
+    assert index.allows(no_sounds, "Low Poly Trees")
+    assert not index.allows(no_sounds, "Card Game Sounds")
+    assert not index.allows(pixel_no_ui, "Pixel UI Kit")
+    assert index.allows(pixel_no_ui, "Pixel Forest Tileset")
+
+
+def test_filter_from_doc():
+    assert KeywordFilter.from_doc(None).is_empty()
+    assert KeywordFilter.from_doc({"include": ["Pixel"]}) == KeywordFilter(include=frozenset({"pixel"}))
+
+
+def test_filter_key_is_order_independent():
+    a = KeywordFilter.from_doc({"include": ["Trees", "rocks"], "exclude": ["sfx"]})
+    b = KeywordFilter.from_doc({"include": ["rocks", "trees"], "exclude": ["SFX"]})
+
+    assert a.key() == b.key()
+    assert a.key() != KeywordFilter.from_doc({"include": ["rocks", "trees", "sfx"]}).key()
@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from utils.lease import get_replica_shard
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
+
+# each process is a separate "replica" racing for the same lease
+ACQUIRE_SCRIPT = """
+import sys
+from datetime import timedelta
+from utils.db_manager import DBManager
+db = DBManager()
+got = db.acquire_lease(sys.argv[1], sys.argv[2], timedelta(seconds=float(sys.argv[3])))
+print(int(got))
+"""
+
+
+def mongo_available() -> bool:
+    try:
+        MongoClient(MONGO_URI, serverSelectionTimeoutMS=500).admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+requires_mongo = pytest.mark.skipif(not mongo_available(), reason=f"needs a local mongod at {MONGO_URI}")
+
+
+@pytest.fixture
+def database():
+    name = f"assetsy_test_{uuid.uuid4().hex[:8]}"
+    yield name
+    MongoClient(MONGO_URI).drop_database(name)
+
+
+def race(database: str, lease: str, holders: list[str], ttl: float = 60) -> list[bool]:
+    env = {**os.environ, "MONGO_URI": MONGO_URI, "MONGO_DB": database}
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", ACQUIRE_SCRIPT, lease, holder, str(ttl)],
+            cwd=REPO_ROOT,
+            env=env,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for holder in holders
+    ]
+    return [process.communicate()[0].strip().endswith("1") for process in processes]
+
+
+@requires_mongo
+def test_only_one_process_gets_the_lease(database):
+    results = race(database, "scraper", [f"replica-{i}" for i in range(6)])
+
+    assert sum(results) == 1
+
+
+@requires_mongo
+def test_holder_renews_and_expired_lease_is_taken_over(database):
+    assert race(database, "scraper", ["a"]) == [True]
+    assert race(database, "scraper", ["a", "b"]) == [True, False]
+
+    assert race(database, "other", ["a"], ttl=0) == [True]
+    assert race(database, "other", ["b"]) == [True]
+
+
+def test_replica_shard(monkeypatch):
+    monkeypatch.delenv("REPLICA_COUNT", raising=False)
+    assert get_replica_shard() is None
+
+    monkeypatch.setenv("REPLICA_COUNT", "3")
+    monkeypatch.setenv("REPLICA_INDEX", "2")
+    assert get_replica_shard() == (2, 3)
+
+    monkeypatch.setenv("REPLICA_INDEX", "3")
+    with pytest.raises(ValueError):
+        get_replica_shard()
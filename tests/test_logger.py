@@ -0,0 +1,64 @@
+import io
+import json
+import logging
+import sys
+
+from utils.logger import JsonFormatter, SamplingFilter, make_queue_handler, parse_sampling
+
+
+def make_record(name="app", level=logging.INFO, msg="hello %s", args=("world",), exc_info=None):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, exc_info)
+
+
+def test_json_formatter_fields():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(level=logging.ERROR, exc_info=sys.exc_info())
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert (entry["level"], entry["logger"], entry["message"]) == ("ERROR", "app", "hello world")
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_sampling_keeps_fraction_and_all_warnings():
+    sampling = SamplingFilter(parse_sampling("scrapers.itch_scraper=0.25, scrapers=1"))
+
+    kept = [sampling.filter(make_record("scrapers.itch_scraper")) for _ in range(8)]
+
+    assert kept == [False, False, False, True, False, False, False, True]
+    assert sampling.filter(make_record("scrapers.itch_scraper", level=logging.WARNING))
+    assert sampling.filter(make_record("scrapers.fab_scraper"))
+    assert sampling.filter(make_record("scrapers_other"))
+
+
+def test_sampling_rate_zero_drops_everything():
+    sampling = SamplingFilter(parse_sampling("telegram=0,utils=0.1"))
+
+    assert not any(sampling.filter(make_record("telegram.ext")) for _ in range(100))
+    assert sum(sampling.filter(make_record("utils.db_manager")) for _ in range(100)) == 10
+
+
+def test_queue_handler_defers_output_to_listener():
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(JsonFormatter())
+    handler, listener = make_queue_handler(target)
+    logger = logging.getLogger("test_queue_logging")
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    try:
+        raise KeyError("missing")
+    except KeyError:
+        logger.exception("failed for %s", "item")
+    assert stream.getvalue() == ""  # nothing written on the caller's thread
+
+    listener.start()
+    listener.stop()
+    logger.removeHandler(handler)
+
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "failed for item"
+    assert "KeyError: 'missing'" in entry["exception"]
@@ -0,0 +1,39 @@
+import pytest
+
+from scrapers.models import FabData, FabItem, ItchData, ItchItem, ScrapedData, UnityAsset, UnityData
+
+# documents as they already sit in scraped_data
+STORED_DOCS = [
+    (UnityData, {"assets": [{"name": "Sounds", "url": "https://u/1", "coupon": "CODE"}]}),
+    (UnityData, {"assets": [{"name": "Trees", "url": "https://u/2", "coupon": None}]}),
+    (FabData, {"end_date": "July 14", "items": [{"title": "ALL ITEMS", "url": "https://f/free"}]}),
+    (ItchData, {"items": [{"id": "1", "title": "Pack", "url": "https://i/1"}]}),
+]
+
+
+def test_stored_documents_round_trip():
+    for model, doc in STORED_DOCS:
+        assert model.from_doc(doc).to_doc() == doc
+
+
+def test_digest_ignores_key_order_and_tracks_content():
+    data = ItchData((ItchItem("1", "Pack", "https://i/1"),))
+    reordered = ItchData.from_doc({"items": [{"url": "https://i/1", "title": "Pack", "id": "1"}]})
+
+    assert data == reordered
+    assert data.digest() == reordered.digest()
+    assert data.digest() != ItchData((ItchItem("1", "Pack 2", "https://i/1"),)).digest()
+
+
+def test_models_are_slotted():
+    for value in (UnityAsset("a", "u"), FabItem("a", "u"), ItchItem("1", "a", "u"), FabData()):
+        assert not hasattr(value, "__dict__")
+
+
+def test_models_must_implement_the_document_mapping():
+    class Partial(ScrapedData):
+        def to_doc(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,37 @@
+from bot.notifier import Notifier
+from scrapers.models import ItchData, ItchItem, ScraperChange
+
+OLD = ItchData((ItchItem("1", "Trees", "u1"),))
+NEW = ItchData((ItchItem("1", "Trees", "u1"), ItchItem("2", "Pixel Rocks", "u2")))
+
+
+class FakeNotifierDB:
+    def __init__(self, subscribers: dict[int, dict]):
+        self.subscribers = subscribers
+        self.messages: dict[str, tuple[list[int], str]] = {}
+
+    def get_scraper_subscriber_filters(self, scraper_name):
+        return self.subscribers
+
+    def enqueue_outbox_message(self, message_id, user_ids, text, parse_mode=None):
+        self.messages[message_id] = (user_ids, text)
+        return len(user_ids)
+
+
+def test_message_ids_follow_the_change_not_the_text():
+    db = FakeNotifierDB({1: {}, 2: {}, 3: {"include": ["trees"]}})
+    notifier = Notifier(db, admin_user_id=99)
+
+    assert notifier.enqueue_changes([ScraperChange("itch", OLD, NEW, revision=4)]) == 2
+    first = dict(db.messages)
+    [(user_ids, text)] = first.values()
+    assert user_ids == [1, 2]  # user 3's filter leaves nothing to announce
+
+    # the same change again, e.g. re-detected after a crash: same entry
+    notifier.enqueue_changes([ScraperChange("itch", OLD, NEW, revision=4)])
+    assert db.messages == first
+
+    # the same text for a later change is a new message
+    notifier.enqueue_changes([ScraperChange("itch", OLD, NEW, revision=6)])
+    assert len(db.messages) == 2
+    assert {text for _, text in db.messages.values()} == {text}
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import timedelta
+
+from telegram.error import Forbidden, NetworkError
+
+from bot.outbox import MAX_ATTEMPTS, OutboxDispatcher, make_message_id, retry_delay
+
+
+class FakeOutboxDB:
+    """In-memory stand-in for the DBManager outbox methods."""
+
+    def __init__(self):
+        self.messages = {}
+        self.jobs = {}
+
+    def enqueue_outbox_message(self, message_id, user_ids, text, parse_mode=None):
+        self.messages.setdefault(message_id, {"text": text, "parse_mode": parse_mode})
+        added = 0
+        for user_id in user_ids:
+            if (message_id, user_id) not in self.jobs:
+                self.jobs[(message_id, user_id)] = {
+                    "_id": (message_id, user_id),
+                    "message_id": message_id,
+                    "user_id": user_id,
+                    "status": "pending",
+                    "attempts": 0,
+                }
+                added += 1
+        return added
+
+    def get_outbox_message(self, message_id):
+        return self.messages.get(message_id)
+
+    def claim_outbox_job(self, lease, shard=None):
+        for job in self.jobs.values():
+            if job["status"] == "pending":
+                job["status"] = "sending"
+                job["attempts"] += 1
+                return dict(job)
+        return None
+
+    def complete_outbox_job(self, job_id):
+        self.jobs[job_id]["status"] = "sent"
+
+    def retry_outbox_job(self, job_id, delay, error):
+        self.jobs[job_id]["status"] = "retry"  # not due again within the test
+
+    def fail_outbox_job(self, job_id, error):
+        self.jobs[job_id]["status"] = "failed"
+
+
+class FakeBot:
+    def __init__(self, errors=None):
+        self.sent = []
+        self.errors = errors or {}
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        if error := self.errors.get(chat_id):
+            raise error
+        self.sent.append((chat_id, text))
+
+
+def test_delivers_each_recipient_once():
+    db, bot = FakeOutboxDB(), FakeBot()
+    outbox = OutboxDispatcher(db, bot, on_blocked=lambda user_id: None)
+
+    outbox.enqueue("m1", [1, 2, 3], "hello")
+    outbox.enqueue("m1", [1, 2, 3, 4], "hello")  # re-enqueue after a "restart" only adds the new user
+    sent = asyncio.run(outbox.drain())
+
+    assert sent == 4
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2, 3, 4]
+
+
+def test_blocked_user_removed_and_transient_error_retried():
+    blocked = []
+    db = FakeOutboxDB()
+    bot = FakeBot(errors={2: Forbidden("blocked"), 3: NetworkError("timeout")})
+    outbox = OutboxDispatcher(db, bot, on_blocked=blocked.append)
+
+    outbox.enqueue("m1", [1, 2, 3], "hello")
+    asyncio.run(outbox.drain())
+
+    assert blocked == [2]
+    assert db.jobs[("m1", 1)]["status"] == "sent"
+    assert db.jobs[("m1", 2)]["status"] == "failed"
+    assert db.jobs[("m1", 3)]["status"] == "retry"
+
+
+def test_retry_delay_backs_off_and_caps():
+    assert retry_delay(1) < retry_delay(2) < retry_delay(3)
+    assert retry_delay(MAX_ATTEMPTS + 20) == timedelta(hours=1)
+
+
+def test_message_id_is_keyed():
+    assert make_message_id("unity", "a") == make_message_id("unity", "a")
+    assert make_message_id("unity", "a") != make_message_id("unity", "b")
+    assert make_message_id("unity", "a") != make_message_id("fab", "a")
@@ -0,0 +1,48 @@
+from utils.rate_limit import RateLimiter, RecentKeys
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_a_burst_then_refills():
+    clock = FakeClock()
+    limiter = RateLimiter({"sub": (3, 1.0), "default": (1, 0.5)}, clock=clock)
+
+    assert [limiter.allow(1, "sub") for _ in range(4)] == [True, True, True, False]
+    # other users and actions have their own buckets, unknown actions share the default one
+    assert limiter.allow(2, "sub")
+    assert limiter.allow(1, "help") and not limiter.allow(1, "filters")
+
+    clock.now = 1.0
+    assert limiter.allow(1, "sub") and not limiter.allow(1, "sub")
+    assert not limiter.allow(1, "help")
+    clock.now = 2.0
+    assert limiter.allow(1, "help")
+
+
+def test_buckets_are_bounded():
+    limiter = RateLimiter({"default": (1, 0.0)}, max_keys=2, clock=FakeClock())
+    assert limiter.allow(1, "x") and limiter.allow(2, "x") and limiter.allow(3, "x")
+    # user 1's drained bucket was the least recently used and got dropped
+    assert limiter.allow(1, "x")
+    assert not limiter.allow(3, "x")
+
+
+def test_recent_keys_flag_repeats_within_the_window():
+    clock = FakeClock()
+    recent = RecentKeys(1.0, clock=clock)
+
+    assert not recent.seen((1, "sub/add/unity"))
+    clock.now = 0.5
+    assert recent.seen((1, "sub/add/unity"))
+    assert not recent.seen((1, "sub/rem/unity"))
+    clock.now = 1.5
+    assert not recent.seen((1, "sub/add/unity"))
+
+    recent.forget((1, "sub/add/unity"))
+    assert not recent.seen((1, "sub/add/unity"))
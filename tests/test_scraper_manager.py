@@ -0,0 +1,295 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from scrapers.itch_scraper import QUICK_SCAN_PAGES, ItchScraper
+from scrapers.models import ItchData, ItchItem
+from scrapers.scraper_interface import NOT_MODIFIED, QuickScraper, ScrapeResult
+from scrapers.scraper_manager import ScraperManager
+from utils.circuit_breaker import FAILURE_THRESHOLD, BreakerState
+from utils.http_cache import HttpCache
+
+
+class FakeManagerDB:
+    """Just enough of DBManager for the lease and the run bookkeeping."""
+
+    def is_scraping_enabled(self):
+        return True
+
+    def acquire_lease(self, name, holder, ttl):
+        return True
+
+    def release_lease(self, name, holder):
+        pass
+
+
+def test_overlapping_triggers_share_one_run(monkeypatch):
+    manager = ScraperManager(notifier=None, db_manager=FakeManagerDB())
+    scrapes = 0
+
+    async def run_scrapers(force=False, quick=False):
+        nonlocal scrapes
+        scrapes += 1
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(manager, "_run_scrapers", run_scrapers)
+
+    async def main():
+        first, joined_first = manager.start_run("schedule")
+        second, joined_second = manager.start_run("admin")
+        results = await asyncio.gather(first.wait(), second.wait(), manager.process_scrapers(trigger="admin"))
+        # the next trigger after the run ended starts a fresh one
+        third, joined_third = manager.start_run("admin")
+        await third.wait()
+        return first, second, third, (joined_first, joined_second, joined_third), results
+
+    first, second, third, joined, results = asyncio.run(main())
+
+    assert second is first
+    assert joined == (False, True, False)
+    assert results == [None, None, True]
+    assert third.run_id == first.run_id + 1
+    assert scrapes == 2
+
+
+def test_forced_trigger_follows_a_run_that_is_not_forced(monkeypatch):
+    manager = ScraperManager(notifier=None, db_manager=FakeManagerDB())
+    events = []
+
+    async def run_scrapers(force=False, quick=False):
+        events.append(("start", force))
+        await asyncio.sleep(0.05)
+        events.append(("end", force))
+
+    monkeypatch.setattr(manager, "_run_scrapers", run_scrapers)
+
+    async def main():
+        scheduled, _ = manager.start_run("schedule")
+        forced, joined_forced = manager.start_run("admin", force=True)
+        # the forced follow-up is what later triggers join
+        again, joined_again = manager.start_run("admin", force=True)
+        late, joined_late = manager.start_run("schedule")
+        results = await asyncio.gather(scheduled.wait(), forced.wait())
+        return results, (joined_forced, joined_again, joined_late), scheduled, forced, again, late
+
+    results, joined, scheduled, forced, again, late = asyncio.run(main())
+
+    assert results == [None, None]
+    assert joined == (False, True, True)
+    assert forced is not scheduled and again is forced and late is forced
+    assert events == [("start", False), ("end", False), ("start", True), ("end", True)]
+
+
+def test_only_the_starting_trigger_sees_a_failed_run(monkeypatch):
+    manager = ScraperManager(notifier=None, db_manager=FakeManagerDB())
+
+    async def run_scrapers(force=False, quick=False):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(manager, "_run_scrapers", run_scrapers)
+
+    async def main():
+        started = asyncio.create_task(manager.process_scrapers(trigger="admin"))
+        await asyncio.sleep(0)
+        joined = await manager.process_scrapers()
+        with pytest.raises(RuntimeError):
+            await started
+        return joined
+
+    assert asyncio.run(main()) is True
+
+
+def test_skipped_run_says_why():
+    class DisabledDB(FakeManagerDB):
+        def is_scraping_enabled(self):
+            return False
+
+    manager = ScraperManager(notifier=None, db_manager=DisabledDB())
+
+    async def main():
+        run, _ = manager.start_run("schedule")
+        return await run.wait()
+
+    assert asyncio.run(main()) == "scraping is disabled"
+
+
+class CachedScraper:
+    """Answers NOT_MODIFIED while its cache is warm, like a scraper whose every fetch was a 304."""
+
+    data_type = ItchData
+    scrape_timeout = timedelta(seconds=10)
+
+    def __init__(self):
+        self.cache_warm = True
+        self.scrapes = 0
+
+    def scrape_data(self):
+        self.scrapes += 1
+        return ScrapeResult(NOT_MODIFIED if self.cache_warm else ItchData(), "v1")
+
+    def invalidate_cache(self):
+        self.cache_warm = False
+
+    def load_data(self, doc):
+        return ItchData.from_doc(doc) if doc else None
+
+
+def test_not_modified_short_circuits_only_when_stored_state_matches():
+    class VersionDB(FakeManagerDB):
+        stored_version = "v1"
+
+        def get_source_version(self, name):
+            return self.stored_version
+
+        def get_assets(self, name):
+            raise AssertionError("stored assets shouldn't be loaded for an unmodified source")
+
+    db = VersionDB()
+    manager = ScraperManager(notifier=None, db_manager=db)
+    scraper = CachedScraper()
+
+    asyncio.run(manager._process_scraper(scraper, "itch"))
+    assert (scraper.scrapes, scraper.cache_warm) == (1, True)
+
+    # a crash after fetching left the cache ahead of Mongo: rescrape with a cold cache
+    db.stored_version = "v0"
+    db.get_assets = lambda name: ItchData().to_doc()
+    db.set_source_version = lambda name, version: None
+    asyncio.run(manager._process_scraper(scraper, "itch"))
+    assert (scraper.scrapes, scraper.cache_warm) == (3, False)
+
+
+class ChangedScraper(CachedScraper):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.cache_warm = False
+
+    def get_scraper_name(self):
+        return self.name
+
+    def create_update_message(self, old, new, title_filter=None):
+        return f"{self.name} changed"
+
+    def get_item_ids(self, data):
+        return set()
+
+
+def test_changes_of_one_run_are_announced_together_before_storing():
+    events = []
+
+    class RunDB(FakeManagerDB):
+        def set_last_scrape_at(self, quick=False):
+            pass
+
+        def get_source_version(self, name):
+            return None
+
+        def get_assets(self, name):
+            return {}
+
+        def get_breaker_state(self, name):
+            return None
+
+        def get_revision(self, name):
+            return 0
+
+        def update_assets(self, name, assets, source_version=None):
+            events.append(("store", name))
+
+    class FakeNotifier:
+        def enqueue_changes(self, changes):
+            events.append(("notify", [change.scraper_name for change in changes]))
+
+    async def deliver():
+        events.append(("deliver",))
+        return 0
+
+    manager = ScraperManager(notifier=FakeNotifier(), db_manager=RunDB(), deliver=deliver)
+    manager.scrapers = [ChangedScraper("unity"), ChangedScraper("itch")]
+    manager.history.record = lambda *args: None
+    asyncio.run(manager._run_scrapers())
+
+    assert events == [("notify", ["unity", "itch"]), ("deliver",), ("store", "unity"), ("store", "itch")]
+
+
+class BreakerDB(FakeManagerDB):
+    def __init__(self, states=None):
+        self.states = states or {}
+
+    def set_last_scrape_at(self, quick=False):
+        pass
+
+    def get_source_version(self, name):
+        return None
+
+    def get_assets(self, name):
+        return {}
+
+    def get_breaker_state(self, name):
+        return self.states.get(name)
+
+    def set_breaker_state(self, name, state):
+        self.states[name] = state
+
+
+class FailingScraper(ChangedScraper, QuickScraper):
+    def scrape_data(self):
+        raise RuntimeError("listing moved")
+
+    def quick_scrape_data(self, stored):
+        raise RuntimeError("listing moved")
+
+
+def test_quick_scan_failures_trip_their_own_breaker():
+    db = BreakerDB()
+    manager = ScraperManager(notifier=None, db_manager=db)
+    manager.scrapers = [FailingScraper("itch")]
+
+    with pytest.raises(ExceptionGroup):
+        asyncio.run(manager._run_scrapers(quick=True))
+    assert list(db.states) == ["itch:quick"]
+
+
+def test_failed_probe_is_not_reported_again():
+    expired = datetime.now(UTC) - timedelta(minutes=1)
+    tripped = BreakerState(FAILURE_THRESHOLD, 1, expired, "RuntimeError: listing moved")
+    db = BreakerDB({"itch": tripped.to_doc()})
+    manager = ScraperManager(notifier=None, db_manager=db)
+    manager.scrapers = [FailingScraper("itch")]
+
+    asyncio.run(manager._run_scrapers())
+
+    assert BreakerState.from_doc(db.states["itch"]).trips == 2
+
+
+def test_full_run_drops_items_expired_beyond_the_quick_scan(monkeypatch, tmp_path):
+    stored = ItchData(tuple(ItchItem(str(page), f"Pack {page}", f"u{page}") for page in range(1, 8)))
+
+    class StoredDB(FakeManagerDB):
+        def get_source_version(self, name):
+            return "swept"
+
+        def get_assets(self, name):
+            return stored.to_doc()
+
+        def get_revision(self, name):
+            return 3
+
+    async def fetch_page(client, page, stats):
+        if page <= QUICK_SCAN_PAGES:
+            stats.cache_hits += 1  # the top of the listing answers 304
+        # page 7's sale ended, the listing is one page shorter now
+        return [{"id": str(page), "title": f"Pack {page}", "url": f"u{page}", "sale": "-100%"}] if page < 7 else []
+
+    scraper = ItchScraper()
+    scraper.http_cache = HttpCache(tmp_path)
+    monkeypatch.setattr(scraper, "_fetch_page", fetch_page)
+    monkeypatch.setattr("scrapers.itch_scraper.PAGE_DELAY_SECONDS", 0)
+    manager = ScraperManager(notifier=None, db_manager=StoredDB())
+
+    update = asyncio.run(manager._process_scraper(scraper, "itch"))
+
+    assert scraper.get_item_ids(update.change.new) == {"1", "2", "3", "4", "5", "6"}
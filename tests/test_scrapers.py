@@ -0,0 +1,45 @@
+import asyncio
+import subprocess
+import sys
+
+from scrapers.__main__ import run
+from scrapers.models import ItchData, ItchItem
+from scrapers.scraper_interface import ScrapeResult
+from scrapers.scrapers import get_scraper, get_scraper_infos, get_scrapers
+
+
+def test_registry_metadata_matches_scrapers():
+    for info in get_scraper_infos():
+        scraper = get_scraper(info.name)
+
+        assert scraper.get_scraper_name() == info.name
+        assert scraper.get_friendly_name() == info.friendly_name
+
+
+def test_instances_are_shared():
+    assert get_scrapers()[0] is get_scraper(get_scraper_infos()[0].name)
+
+
+def test_bot_imports_without_selenium():
+    code = "import sys, bot.bot, scrapers.fab_scraper, scrapers.unity_scraper; sys.exit('selenium' in sys.modules)"
+
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_dry_run_diffs_against_stored_state_without_writing(monkeypatch):
+    stored = ItchData((ItchItem("1", "Old", "u1"), ItchItem("2", "Kept", "u2")))
+    scraped = ItchData((ItchItem("2", "Kept", "u2"), ItchItem("3", "New", "u3")))
+    scraper = get_scraper("itch")
+
+    async def scrape_data():
+        return ScrapeResult(scraped, bytes_fetched=42)
+
+    class ReadOnlyDB:
+        def get_assets(self, name):
+            return stored.to_doc()
+
+    monkeypatch.setattr(scraper, "scrape_data", scrape_data)
+
+    [result] = asyncio.run(run(["itch"], ReadOnlyDB()))
+
+    assert (result.items, result.bytes_fetched, result.status) == (2, 42, "changed +1 -1")
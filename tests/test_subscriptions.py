@@ -0,0 +1,63 @@
+import asyncio
+from datetime import timedelta
+
+from bot.subscriptions import SubscriptionBatcher
+
+
+class FakeSubscriptionDB:
+    def __init__(self, subscriptions):
+        self.subscriptions = list(subscriptions)
+        self.reads = 0
+        self.writes = []
+
+    def get_user_subscriptions(self, user_id):
+        self.reads += 1
+        return list(self.subscriptions)
+
+    def update_subscriptions(self, user_id, added, removed):
+        self.writes.append((added, removed))
+        self.subscriptions = [name for name in self.subscriptions if name not in removed] + added
+
+
+def test_a_burst_of_toggles_is_one_read_one_write_and_one_notice():
+    db = FakeSubscriptionDB(["unity"])
+    notices = []
+
+    async def on_flushed(user_id, label, added, removed):
+        notices.append((user_id, label, added, removed))
+
+    batcher = SubscriptionBatcher(db, on_flushed, delay=timedelta(seconds=0.05))
+
+    async def main():
+        batcher.toggle(1, "fab", True, "someone")
+        batcher.toggle(1, "itch", True, "someone")
+        batcher.toggle(1, "unity", False, "someone")
+        state = batcher.toggle(1, "itch", False, "someone")  # cancels the earlier add
+        assert state == batcher.current(1) == {"fab"}
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+
+    assert db.reads == 1
+    assert db.writes == [(["fab"], ["unity"])]
+    assert notices == [(1, "someone", ["fab"], ["unity"])]
+    assert batcher.current(1) == {"fab"}
+
+
+def test_toggles_that_cancel_out_write_nothing():
+    db = FakeSubscriptionDB([])
+    notices = []
+
+    async def on_flushed(*args):
+        notices.append(args)
+
+    batcher = SubscriptionBatcher(db, on_flushed)
+
+    async def main():
+        batcher.toggle(1, "fab", True, "someone")
+        batcher.toggle(1, "fab", False, "someone")
+        await batcher.flush_all()
+
+    asyncio.run(main())
+
+    assert db.writes == [] and notices == []
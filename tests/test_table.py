@@ -0,0 +1,7 @@
+from utils.table import format_table
+
+
+def test_pads_columns_to_the_widest_cell():
+    table = format_table([("name", "items"), ("itch", "12"), ("unity", "1")])
+
+    assert table.splitlines() == ["name   items", "itch   12", "unity  1"]
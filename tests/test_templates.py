@@ -0,0 +1,32 @@
+from bot.templates import ResponseTemplates
+from scrapers.scrapers import ScraperInfo
+
+
+def make_templates():
+    scrapers = {
+        "unity": ScraperInfo("unity", "Unity", "scrapers.unity_scraper", "UnityScraper"),
+        "fab": ScraperInfo("fab", "Fab", "scrapers.fab_scraper", "FabScraper"),
+    }
+    return ResponseTemplates([("⚙️ Help", "help")], scrapers)
+
+
+def buttons(markup):
+    return [(row[0].text, row[0].callback_data) for row in markup.inline_keyboard]
+
+
+def test_subscription_keyboards_are_built_once_per_set():
+    templates = make_templates()
+
+    first = templates.subscriptions(["fab"])
+    # same set, different order/container, plus a scraper that's no longer registered
+    assert templates.subscriptions({"fab", "gone"}) is first
+    assert buttons(first) == [("✔️ Add Unity", "sub/add/unity"), ("❌ Remove Fab", "sub/rem/fab"), ("↩ Back", "help")]
+    assert templates.subscriptions([]) is not first
+
+
+def test_admin_menu_variants_are_prebuilt():
+    templates = make_templates()
+
+    assert templates.admin_menu(True) is templates.admin_menu(True)
+    assert ("⏸ Disable daily updates", "adm/toggle") in buttons(templates.admin_menu(True))
+    assert ("▶️ Enable daily updates", "adm/toggle") in buttons(templates.admin_menu(False))
@@ -1,16 +1,22 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+
+from scrapers.models import UnityAsset, UnityData
 from scrapers.unity_scraper import UnityScraper
 
 
 def test_create_message():
-    data = {
-        "assets": [
-            {
-                "name": "Card Game Sounds",
-                "url": "https://assetstore.unity.com/packages/audio/sound-fx/card-game-sounds-112743",
-                "coupon": "EPICSOUNDSANDFX2026",
-            }
-        ]
-    }
+    data = UnityData(
+        (
+            UnityAsset(
+                "Card Game Sounds",
+                "https://assetstore.unity.com/packages/audio/sound-fx/card-game-sounds-112743",
+                "EPICSOUNDSANDFX2026",
+            ),
+        )
+    )
 
     message = UnityScraper().create_message(data)
 
@@ -19,7 +25,7 @@ def test_create_message():
 
 
 def test_create_message_without_coupon():
-    data = {"assets": [{"name": "Some-Asset", "url": "https://example.com", "coupon": None}]}
+    data = UnityData((UnityAsset("Some-Asset", "https://example.com"),))
 
     message = UnityScraper().create_message(data)
 
@@ -28,6 +34,79 @@ def test_create_message_without_coupon():
 
 
 def test_create_message_no_assets():
-    message = UnityScraper().create_message({"assets": []})
+    message = UnityScraper().create_message(UnityData())
 
     assert "No free items found" in message
+
+
+# re-record with: uv run python -m scrapers.unity_scraper --record tests/fixtures/unity_publisher_sale.html
+PUBLISHER_SALE_PAGE = Path(__file__).parent / "fixtures" / "unity_publisher_sale.html"
+
+# Markup corner cases the parser has to get through: nested tags in the name and coupon, a nested section
+CALLOUT_EDGE_CASES_HTML = """
+<html><body>
+<section data-type="Hero"><h2>Publisher of the week</h2><a href="/publishers/1">Publisher</a></section>
+<section data-type="CalloutSlim" class="callout">
+  <div><h2>
+    Card Game <b>Sounds</b>
+  </h2></div>
+  <section class="inner"><p>nested section stays part of the callout</p></section>
+  <span class="body">Get it for free with coupon code <span>EPICSOUNDS2026</span> at checkout.</span>
+  <a href="/packages/audio/sound-fx/card-game-sounds-112743">Get it</a>
+</section>
+<section data-type="CalloutSlim">
+  <h2>Low Poly Trees</h2>
+  <a href="https://assetstore.unity.com/packages/3d/trees-1">Get it</a>
+</section>
+</body></html>
+"""
+
+
+def test_fetches_recorded_page(monkeypatch):
+    page = PUBLISHER_SALE_PAGE.read_bytes()
+    real_client = httpx.AsyncClient
+
+    def make_client(**kwargs):
+        return real_client(
+            **kwargs | {"transport": httpx.MockTransport(lambda request: httpx.Response(200, content=page))}
+        )
+
+    monkeypatch.setattr("scrapers.unity_scraper.httpx.AsyncClient", make_client)
+
+    result = asyncio.run(UnityScraper()._fetch_server_rendered())
+
+    # only the shape is pinned down, the assets change with every re-recording
+    assert result.data.assets
+    for asset in result.data.assets:
+        assert asset.name and asset.name == " ".join(asset.name.split())
+        assert asset.url.startswith("https://assetstore.unity.com/packages/")
+        assert asset.coupon is None or asset.coupon.isalnum()
+    assert result.bytes_fetched == len(page)
+
+
+def test_parses_callout_edge_cases():
+    data = UnityScraper()._parse_callouts(CALLOUT_EDGE_CASES_HTML)
+
+    assert data == UnityData(
+        (
+            UnityAsset(
+                "Card Game Sounds",
+                "https://assetstore.unity.com/packages/audio/sound-fx/card-game-sounds-112743",
+                "EPICSOUNDS2026",
+            ),
+            UnityAsset("Low Poly Trees", "https://assetstore.unity.com/packages/3d/trees-1"),
+        )
+    )
+
+
+def test_falls_back_to_browser_when_page_is_client_rendered(monkeypatch):
+    scraper = UnityScraper()
+    browser_data = UnityData((UnityAsset("From browser", "https://example.com"),))
+
+    async def fetch_server_rendered():
+        return scraper._parse_callouts("<html><body><div id='root'></div></body></html>")
+
+    monkeypatch.setattr(scraper, "_fetch_server_rendered", fetch_server_rendered)
+    monkeypatch.setattr(scraper, "_scrape_with_selenium", lambda: browser_data)
+
+    assert asyncio.run(scraper.scrape_data()).data == browser_data
@@ -0,0 +1,106 @@
+import asyncio
+import contextlib
+from datetime import timedelta
+
+from scrapers.scraper_manager import ScraperManager
+from scrapers.worker import ScrapeWorker
+
+
+class FakeWorkerDB:
+    def __init__(self):
+        self.finished = {}
+
+    def is_scraping_enabled(self):
+        return True
+
+    def acquire_lease(self, name, holder, ttl):
+        return True
+
+    def release_lease(self, name, holder):
+        pass
+
+    def finish_scrape_request(self, request_id, result):
+        self.finished[request_id] = result
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.admin_messages = {}
+
+    def notify_admin(self, message_id, text):
+        self.admin_messages[message_id] = text
+
+
+def test_scrape_requests_share_a_run_and_report_to_the_admin(monkeypatch):
+    db, notifier = FakeWorkerDB(), FakeNotifier()
+    manager = ScraperManager(notifier, db)
+    runs = 0
+
+    async def run_scrapers(force=False, quick=False):
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(manager, "_run_scrapers", run_scrapers)
+    worker = ScrapeWorker(manager, db, notifier)
+
+    async def main():
+        await asyncio.gather(worker._serve_request({"_id": "a"}), worker._serve_request({"_id": "b"}))
+
+    asyncio.run(main())
+
+    assert runs == 1
+    assert db.finished == {"a": "✅ Scrape run #1 finished", "b": "✅ Scrape run #1 finished"}
+    assert set(notifier.admin_messages) == {"scrape_request:a", "scrape_request:b"}
+
+
+def test_a_failed_run_is_reported_in_full_once(monkeypatch):
+    db, notifier = FakeWorkerDB(), FakeNotifier()
+    manager = ScraperManager(notifier, db)
+
+    async def run_scrapers(force=False, quick=False):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(manager, "_run_scrapers", run_scrapers)
+    worker = ScrapeWorker(manager, db, notifier)
+
+    async def main():
+        await asyncio.gather(worker._serve_request({"_id": "a"}), worker._serve_request({"_id": "b"}))
+
+    asyncio.run(main())
+
+    assert db.finished == {
+        "a": "⚠️ Scrape run #1 failed: RuntimeError('boom')",
+        "b": "⚠️ Scrape run #1 failed, see its error report",
+    }
+
+
+def test_poll_loop_survives_a_failed_claim(monkeypatch):
+    claims = 0
+
+    class FlakyDB(FakeWorkerDB):
+        def claim_scrape_request(self, holder):
+            nonlocal claims
+            claims += 1
+            if claims == 1:
+                raise ConnectionError("primary stepped down")
+            return None
+
+    db, notifier = FlakyDB(), FakeNotifier()
+    manager = ScraperManager(notifier, db)
+    worker = ScrapeWorker(manager, db, notifier)
+
+    async def idle_schedule(check_interval):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(worker, "_schedule", idle_schedule)
+    monkeypatch.setattr("scrapers.worker.REQUEST_POLL_INTERVAL", timedelta(0))
+
+    async def main():
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(worker.run(timedelta(minutes=10)), timeout=0.05)
+
+    asyncio.run(main())
+
+    assert claims > 1
@@ -0,0 +1,210 @@
+"""Minimal stand-in for the Telegram Bot API, for local load tests of the bot.
+
+Serves just the methods the bot calls, and can post synthetic updates to a running webhook:
+
+    TELEGRAM_API_URL=http://localhost:8081 TELEGRAM_MODE=webhook WEBHOOK_URL=http://localhost:8080 \\
+        WEBHOOK_SECRET=local uv run python assetsy.py
+    uv run python -m tools.fake_bot_api --port 8081 --webhook http://localhost:8080/telegram --secret local
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+import httpx
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_assetsy_bot"}
+
+
+def make_command_update(update_id: int, user_id: int, command: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User {user_id}", "username": f"user{user_id}"},
+            "text": f"/{command}",
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command) + 1}],
+        },
+    }
+
+
+def make_callback_update(update_id: int, user_id: int, data: str) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": f"User {user_id}", "username": f"user{user_id}"}
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": BOT_USER,
+                "text": "⚙️ Choose a command:",
+            },
+        },
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the default backlog of 5 resets connections under load
+
+
+class FakeBotAPI:
+    """Threaded HTTP server answering Bot API calls; counts calls and records when each chat got a reply."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.calls = Counter()
+        self.replies: dict[int, float] = {}  # chat_id -> first reply time since last reset
+        self._lock = threading.Lock()
+        self._message_ids = itertools.count(1)
+        self._server = _Server((host, port), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, method: str, params: dict):
+        with self._lock:
+            self.calls[method] += 1
+            if "chat_id" in params:
+                self.replies.setdefault(int(params["chat_id"]), time.perf_counter())
+
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            time.sleep(min(float(params.get("timeout", 0)), 1))
+            return []
+        if method in ("sendMessage", "editMessageText"):
+            return {
+                "message_id": int(params.get("message_id") or next(self._message_ids)),
+                "date": int(time.time()),
+                "chat": {"id": int(params["chat_id"]) if "chat_id" in params else 0, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        if method == "getWebhookInfo":
+            return {"url": "", "has_custom_certificate": False, "pending_update_count": 0}
+        # setMyCommands, setWebhook, deleteWebhook, answerCallbackQuery, ...
+        return True
+
+    def _make_handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_POST(self):
+                # /bot<token>/<method>
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                params = _parse_params(raw, self.headers.get("Content-Type", ""))
+                body = json.dumps({"ok": True, "result": api.handle(method, params)}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _parse_params(raw: bytes, content_type: str) -> dict:
+    if not raw:
+        return {}
+    if content_type.startswith("application/json"):
+        return json.loads(raw)
+    # PTB sends form fields whose non-string values are JSON-encoded
+    params = {}
+    for key, value in parse_qsl(raw.decode()):
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+async def post_updates(api: FakeBotAPI, webhook: str, secret: str, users: int, concurrency: int) -> None:
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret}
+    semaphore = asyncio.Semaphore(concurrency)
+    posted: dict[int, float] = {}
+    api.replies.clear()
+
+    async with httpx.AsyncClient(timeout=30) as client:
+
+        async def post(user_id: int):
+            async with semaphore:
+                posted[user_id] = time.perf_counter()
+                response = await client.post(
+                    webhook, json=make_command_update(user_id, user_id, "start"), headers=headers
+                )
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post(user_id) for user_id in range(1_000_000, 1_000_000 + users)))
+        # replies arrive after the webhook already acked, wait for them to settle
+        while len(api.replies) < users and time.perf_counter() - started < 60:
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(api.replies[user_id] - posted[user_id] for user_id in posted if user_id in api.replies)
+    print(f"Updates: {users}, replied: {len(latencies)}, elapsed {elapsed:.2f}s ({users / elapsed:.0f} updates/s)")
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f"Reply latency p50 {quantiles[49] * 1000:.1f}ms, p99 {quantiles[98] * 1000:.1f}ms")
+    print(f"API calls: {dict(api.calls)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--webhook", help="bot webhook URL to post synthetic /start updates to")
+    parser.add_argument("--secret", default="", help="WEBHOOK_SECRET of the bot")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    api = FakeBotAPI(args.host, args.port)
+    api.start()
+    print(f"Fake Bot API listening on {api.url}")
+    try:
+        if args.webhook:
+            input("Start the bot against this API, then press Enter to post updates...")
+            asyncio.run(post_updates(api, args.webhook, args.secret, args.users, args.concurrency))
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Load test of the bot's handlers with simulated users, in-process against the fake Bot API.
+
+Every update goes through Application.process_update, so the user tracking in group -1, the real handlers and
+the error handler all run as in production. Reports throughput, p50/p99 handler latency per action and the
+MongoDB commands issued. Needs a MongoDB; the simulated users are written to --mongo-db, dropped afterwards:
+
+    uv run python -m tools.load_test --users 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+
+from dotenv import load_dotenv
+from pymongo import monitoring
+from telegram import Update
+
+from bot.bot import TelegramBot
+from tools.fake_bot_api import FakeBotAPI, make_callback_update, make_command_update
+from utils.db_manager import DBManager
+from utils.table import format_table
+
+FIRST_USER_ID = 1_000_000
+ADMIN_USER_ID = 1
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts the commands pymongo sends (find, update, insert...), from whichever thread sends them."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        with self._lock:
+            self.counts[event.command_name] += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+
+def user_script(scraper_names: list[str]) -> list[tuple[str, str, str]]:
+    """One simulated user's session as (action label, update kind, payload), run in order."""
+    script = [("/start", "command", "start"), ("show_subscriptions", "callback", "show_subscriptions")]
+    for name in scraper_names:
+        script.append(("sub/add", "callback", f"sub/add/{name}"))
+    script.append(("/show_freebies", "command", "show_freebies"))
+    script.append(("sub/rem", "callback", f"sub/rem/{scraper_names[0]}"))
+    script.append(("help", "callback", "help"))
+    return script
+
+
+def percentiles(latencies: list[float]) -> tuple[float, float]:
+    if len(latencies) < 2:
+        return (latencies[0], latencies[0]) if latencies else (0.0, 0.0)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return quantiles[49], quantiles[98]
+
+
+async def run_load(bot, users: int, concurrency: int, admin_every: int) -> tuple[dict[str, list[float]], float, int]:
+    application = bot.application
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors = 0
+    update_ids = itertools.count(1)
+    script = user_script(list(bot.scrapers))
+
+    async def count_error(update, context):
+        nonlocal errors
+        errors += 1
+
+    application.add_error_handler(count_error)
+
+    async def process(label: str, raw: dict):
+        update = Update.de_json(raw, application.bot)
+        started = time.perf_counter()
+        await application.process_update(update)
+        latencies[label].append(time.perf_counter() - started)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def simulate_user(index: int):
+        user_id = FIRST_USER_ID + index
+        async with semaphore:
+            for label, kind, payload in script:
+                make_update = make_command_update if kind == "command" else make_callback_update
+                await process(label, make_update(next(update_ids), user_id, payload))
+            # the admin stats read every user, a few of them during the run show how that scales
+            if admin_every and index % admin_every == 0:
+                await process("adm/stats", make_callback_update(next(update_ids), bot.admin_user_id, "adm/stats"))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(simulate_user(index) for index in range(users)))
+    # coalesced subscription writes still waiting for their burst to end count too
+    await bot.subscriptions.flush_all()
+    return latencies, time.perf_counter() - started, errors
+
+
+def format_report(
+    latencies: dict[str, list[float]], elapsed: float, errors: int, mongo: Counter, api_calls: Counter
+) -> str:
+    total = sum(len(values) for values in latencies.values())
+    lines = [f"Updates: {total} in {elapsed:.2f}s ({total / elapsed:.0f} updates/s), handler errors: {errors}", ""]
+    rows = [("action", "count", "p50", "p99")]
+    for label, values in latencies.items():
+        p50, p99 = percentiles(values)
+        rows.append((label, str(len(values)), f"{p50 * 1000:.1f}ms", f"{p99 * 1000:.1f}ms"))
+    p50, p99 = percentiles([value for values in latencies.values() for value in values])
+    rows.append(("all", str(total), f"{p50 * 1000:.1f}ms", f"{p99 * 1000:.1f}ms"))
+    lines.append(format_table(rows))
+
+    mongo_total = sum(mongo.values())
+    lines.append("")
+    lines.append(f"MongoDB commands: {mongo_total} ({mongo_total / max(total, 1):.2f} per update)")
+    lines += [f"  {name}: {count}" for name, count in mongo.most_common()]
+    lines.append(f"Bot API calls: {dict(api_calls)}")
+    return "\n".join(lines)
+
+
+async def main_async(args) -> None:
+    counter = CommandCounter()
+    monitoring.register(counter)  # only applies to clients created afterwards
+
+    api = FakeBotAPI()
+    api.start()
+    os.environ["TELEGRAM_API_URL"] = api.url
+    db_manager = DBManager()
+    try:
+        bot = TelegramBot(db_manager)
+        await bot.application.initialize()
+        try:
+            counter.reset()
+            api.calls.clear()
+            latencies, elapsed, errors = await run_load(bot, args.users, args.concurrency, args.admin_every)
+        finally:
+            await bot.application.shutdown()
+        print(format_report(latencies, elapsed, errors, counter.counts, api.calls))
+    finally:
+        if not args.keep:
+            db_manager.client.drop_database(db_manager.db.name)
+        db_manager.close()
+        api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100, help="users active at the same time")
+    parser.add_argument("--admin-every", type=int, default=100, help="one admin stats view per this many users")
+    parser.add_argument("--mongo-db", default="assetsy_loadtest", help="throwaway database, dropped afterwards")
+    parser.add_argument("--keep", action="store_true", help="keep the database for inspection")
+    args = parser.parse_args()
+    load_dotenv()
+    if args.mongo_db == os.environ.get("MONGO_DB", "assetsy"):
+        parser.error(f"--mongo-db {args.mongo_db} is the bot's own database, pick a throwaway one")
+
+    os.environ["MONGO_DB"] = args.mongo_db
+    # never the real bot: every call goes to the fake API anyway
+    os.environ["TELEGRAM_BOT_TOKEN"] = "123456:load-test"
+    os.environ["TELEGRAM_ADMIN_USER_ID"] = str(ADMIN_USER_ID)
+    os.environ.pop("HEALTH_PORT", None)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
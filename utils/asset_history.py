@@ -0,0 +1,113 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from utils.db_manager import DBManager
+from utils.logger import setup_logger
+
+# a full snapshot at least this often, so reconstruction replays a bounded number of deltas
+KEYFRAME_INTERVAL = timedelta(days=7)
+KEYFRAME_MAX_DELTAS = 50
+
+
+@dataclass(frozen=True)
+class ItemFreeStats:
+    periods: list[tuple[datetime, datetime | None]]  # (free since, free until or None if still free)
+
+    @property
+    def times_free(self) -> int:
+        return len(self.periods)
+
+    def total_free(self, now: datetime) -> timedelta:
+        return sum(((end or now) - start for start, end in self.periods), timedelta())
+
+
+def make_history_entry(
+    scraper_name: str,
+    previous_ids: set[str],
+    new_ids: set[str],
+    now: datetime,
+    last_keyframe_at: datetime | None,
+    deltas_since_keyframe: int,
+) -> dict | None:
+    """Keyframe (full id list) when one is due, else a delta of added/removed ids; None if nothing changed."""
+    keyframe_due = (
+        last_keyframe_at is None
+        or now - last_keyframe_at >= KEYFRAME_INTERVAL
+        or deltas_since_keyframe >= KEYFRAME_MAX_DELTAS
+    )
+    if keyframe_due:
+        return {"scraper": scraper_name, "timestamp": now, "kind": "keyframe", "ids": sorted(new_ids)}
+
+    added, removed = new_ids - previous_ids, previous_ids - new_ids
+    if not added and not removed:
+        return None
+    return {
+        "scraper": scraper_name,
+        "timestamp": now,
+        "kind": "delta",
+        "added": sorted(added),
+        "removed": sorted(removed),
+    }
+
+
+def replay(keyframe: dict, deltas: Iterable[dict]) -> set[str]:
+    state = set(keyframe["ids"])
+    for delta in deltas:
+        state -= set(delta["removed"])
+        state |= set(delta["added"])
+    return state
+
+
+def free_periods(events: Iterable[tuple[datetime, bool]]) -> list[tuple[datetime, datetime | None]]:
+    """Turns time-ordered (timestamp, item present) observations into free periods."""
+    periods = []
+    since = None
+    for timestamp, present in events:
+        if present and since is None:
+            since = timestamp
+        elif not present and since is not None:
+            periods.append((since, timestamp))
+            since = None
+    if since is not None:
+        periods.append((since, None))
+    return periods
+
+
+class AssetHistory:
+    """Per-scraper history of which item ids were free when, as periodic keyframes plus per-run deltas."""
+
+    def __init__(self, db_manager: DBManager):
+        self.logger = setup_logger(__name__)
+        self.db_manager = db_manager
+
+    def record(self, scraper_name: str, previous_ids: set[str], new_ids: set[str]) -> None:
+        now = datetime.now(UTC)
+        keyframe = self.db_manager.get_history_keyframe(scraper_name)
+        last_keyframe_at = _utc(keyframe["timestamp"]) if keyframe else None
+        deltas = self.db_manager.count_history_deltas(scraper_name, since=last_keyframe_at) if keyframe else 0
+
+        entry = make_history_entry(scraper_name, previous_ids, new_ids, now, last_keyframe_at, deltas)
+        if entry:
+            self.logger.info(f"Recording {entry['kind']} for [{scraper_name}]")
+            self.db_manager.add_history_entry(entry)
+
+    def state_at(self, scraper_name: str, at: datetime) -> set[str] | None:
+        """Item ids that were free at `at`; None if that's before the retained history."""
+        keyframe = self.db_manager.get_history_keyframe(scraper_name, before=at)
+        if keyframe is None:
+            return None
+        deltas = self.db_manager.get_history_deltas(scraper_name, since=_utc(keyframe["timestamp"]), until=at)
+        return replay(keyframe, deltas)
+
+    def item_stats(self, scraper_name: str, item_id: str) -> ItemFreeStats:
+        events = [
+            (_utc(timestamp), present)
+            for timestamp, present in self.db_manager.get_item_presence(scraper_name, item_id)
+        ]
+        return ItemFreeStats(free_periods(events))
+
+
+def _utc(timestamp: datetime) -> datetime:
+    # pymongo hands back naive UTC datetimes
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=UTC)
@@ -0,0 +1,101 @@
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime, timedelta
+
+from utils.db_manager import DBManager
+from utils.logger import setup_logger
+
+# consecutive failed runs before a scraper is skipped
+FAILURE_THRESHOLD = 3
+# cooldowns are in runs of the breaker's trigger: the first trip skips one, then doubling up to this many
+MAX_COOLDOWN_RUNS = 8
+
+
+@dataclass(frozen=True)
+class BreakerState:
+    failures: int = 0  # consecutive failed runs
+    trips: int = 0  # consecutive times it opened, drives the cooldown
+    open_until: datetime | None = None
+    last_error: str | None = None
+
+    def status(self, now: datetime) -> str:
+        """closed: runs normally; open: skipped until open_until; half-open: the next run is a probe."""
+        if self.open_until is None:
+            return "closed"
+        return "open" if now < self.open_until else "half-open"
+
+    def to_doc(self) -> dict:
+        return {
+            "failures": self.failures,
+            "trips": self.trips,
+            "open_until": self.open_until,
+            "last_error": self.last_error,
+        }
+
+    @classmethod
+    def from_doc(cls, doc: dict | None) -> "BreakerState":
+        if not doc:
+            return cls()
+        open_until = doc.get("open_until")
+        if open_until and open_until.tzinfo is None:  # pymongo hands back naive UTC
+            open_until = open_until.replace(tzinfo=UTC)
+        return cls(doc.get("failures", 0), doc.get("trips", 0), open_until, doc.get("last_error"))
+
+
+def breaker_key(scraper_name: str, quick: bool = False) -> str:
+    """Quick scans get their own breaker, their failures say nothing about the full sweep's and vice versa."""
+    return f"{scraper_name}:quick" if quick else scraper_name
+
+
+def cooldown(trips: int, interval: timedelta) -> timedelta:
+    """interval: how often the breaker's trigger runs; anything shorter wouldn't skip a single run."""
+    # exponent capped so a long-dead source can't overflow timedelta
+    return interval * min(2 ** min(max(trips - 1, 0), 16), MAX_COOLDOWN_RUNS)
+
+
+def record_failure(state: BreakerState, now: datetime, error: str, interval: timedelta) -> BreakerState:
+    failures = state.failures + 1
+    # a failed probe reopens straight away, with a longer cooldown than last time
+    if state.status(now) == "half-open" or failures >= FAILURE_THRESHOLD:
+        trips = state.trips + 1
+        return BreakerState(failures, trips, now + cooldown(trips, interval), error)
+    return replace(state, failures=failures, last_error=error)
+
+
+class CircuitBreaker:
+    """Per-scraper breaker kept in runtime_state, so every replica skips a source that keeps failing.
+
+    scraper_name is the breaker_key(), i.e. "<scraper>:quick" for a scraper's quick scans.
+    """
+
+    def __init__(self, db_manager: DBManager, scraper_name: str, interval: timedelta):
+        """interval: how often the scraper runs under this breaker, the unit of its cooldowns."""
+        self.logger = setup_logger(__name__)
+        self.db_manager = db_manager
+        self.scraper_name = scraper_name
+        self.interval = interval
+
+    def state(self) -> BreakerState:
+        return BreakerState.from_doc(self.db_manager.get_breaker_state(self.scraper_name))
+
+    def allow(self) -> bool:
+        status = self.state().status(datetime.now(UTC))
+        if status == "half-open":
+            self.logger.info(f"Probing [{self.scraper_name}] after its cooldown")
+        return status != "open"
+
+    def record_success(self) -> None:
+        state = self.state()
+        if state != BreakerState():
+            if state.open_until:
+                self.logger.info(f"[{self.scraper_name}] recovered, closing its breaker")
+            self.db_manager.set_breaker_state(self.scraper_name, BreakerState().to_doc())
+
+    def record_failure(self, error: Exception) -> BreakerState:
+        now = datetime.now(UTC)
+        state = record_failure(self.state(), now, f"{type(error).__name__}: {error}"[:300], self.interval)
+        if state.open_until and state.open_until > now:
+            self.logger.warning(
+                f"[{self.scraper_name}] failed {state.failures} times in a row, skipping it until {state.open_until}"
+            )
+        self.db_manager.set_breaker_state(self.scraper_name, state.to_doc())
+        return state
@@ -1,11 +1,16 @@
 import os
 import re
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from utils.logger import setup_logger
 
+OUTBOX_RETENTION_SECONDS = int(timedelta(days=7).total_seconds())
+HISTORY_RETENTION_SECONDS = int(timedelta(days=730).total_seconds())
+SCRAPE_REQUEST_RETENTION_SECONDS = int(timedelta(days=1).total_seconds())
+
 
 class DBManager:
     def __init__(self):
@@ -19,18 +24,63 @@ class DBManager:
         self.scraped_data_collection = self.db["scraped_data"]
         self.users_collection = self.db["telegram_users"]
         self.runtime_state_collection = self.db["runtime_state"]
+        self.outbox_messages_collection = self.db["outbox_messages"]
+        self.outbox_jobs_collection = self.db["outbox_jobs"]
+        self.leases_collection = self.db["leases"]
+        self.asset_history_collection = self.db["asset_history"]
+        self.scrape_requests_collection = self.db["scrape_requests"]
+        self._create_indexes()
         self.logger.info("Done")
 
+    def _create_indexes(self):
+        # one job per (message, recipient): re-enqueueing the same message is a no-op
+        self.outbox_jobs_collection.create_index([("message_id", ASCENDING), ("user_id", ASCENDING)], unique=True)
+        self.outbox_jobs_collection.create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+        # finished jobs are kept a while so late duplicates still dedup, then dropped
+        self.outbox_jobs_collection.create_index("finished_at", expireAfterSeconds=OUTBOX_RETENTION_SECONDS)
+        self.outbox_messages_collection.create_index("created_at", expireAfterSeconds=OUTBOX_RETENTION_SECONDS)
+        # only housekeeping, the TTL monitor runs once a minute; lease checks compare expires_at themselves
+        self.leases_collection.create_index("expires_at", expireAfterSeconds=0)
+        self.asset_history_collection.create_index([("scraper", ASCENDING), ("timestamp", ASCENDING)])
+        # the oldest deltas outlive their keyframe by up to KEYFRAME_INTERVAL, state_at treats that as unknown
+        self.asset_history_collection.create_index("timestamp", expireAfterSeconds=HISTORY_RETENTION_SECONDS)
+        self.scrape_requests_collection.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+        # also clears requests whose worker died mid-run, nothing else would finish them
+        self.scrape_requests_collection.create_index("created_at", expireAfterSeconds=SCRAPE_REQUEST_RETENTION_SECONDS)
+
     def close(self):
         self.client.close()
 
+    def ping(self) -> bool:
+        self.client.admin.command("ping")
+        return True
+
     def get_assets(self, scraper_name: str) -> dict:
         result = self.scraped_data_collection.find_one({"scraper": scraper_name})
         return result["assets"] if result else {}
 
-    def update_assets(self, scraper_name: str, assets: dict):
+    def update_assets(self, scraper_name: str, assets: dict, source_version: str | None = None):
         self.logger.info(f"Updating data for [{scraper_name}]")
-        self.scraped_data_collection.update_one({"scraper": scraper_name}, {"$set": {"assets": assets}}, upsert=True)
+        self.scraped_data_collection.update_one(
+            {"scraper": scraper_name},
+            {"$set": {"assets": assets, "source_version": source_version}, "$inc": {"revision": 1}},
+            upsert=True,
+        )
+
+    def get_revision(self, scraper_name: str) -> int:
+        """How many times the stored assets changed; 0 before the first store."""
+        result = self.scraped_data_collection.find_one({"scraper": scraper_name}, {"revision": 1})
+        return result.get("revision", 0) if result else 0
+
+    def get_source_version(self, scraper_name: str) -> str | None:
+        """Validators of the responses the stored assets were parsed from, see ScrapeResult.source_version."""
+        result = self.scraped_data_collection.find_one({"scraper": scraper_name}, {"source_version": 1})
+        return result.get("source_version") if result else None
+
+    def set_source_version(self, scraper_name: str, source_version: str | None):
+        self.scraped_data_collection.update_one(
+            {"scraper": scraper_name}, {"$set": {"source_version": source_version}}, upsert=True
+        )
 
     def upsert_user(self, user_id: int, first_name: str | None, username: str | None) -> None:
         self.users_collection.update_one(
@@ -48,16 +98,18 @@ class DBManager:
     def get_all_users(self) -> list[dict]:
         return list(self.users_collection.find({}).sort("created_at", 1))
 
-    def add_subscription(self, user_id: int, scraper_name: str) -> None:
+    def update_subscriptions(self, user_id: int, added: list[str], removed: list[str]) -> None:
+        """Applies a batch of toggles in one write; an update pipeline, as $addToSet and $pull can't share a field."""
+        changed = added + removed
+        kept = {
+            "$filter": {"input": {"$ifNull": ["$subscriptions", []]}, "cond": {"$not": [{"$in": ["$$this", changed]}]}}
+        }
         self.users_collection.update_one(
             {"user_id": user_id},
-            {"$addToSet": {"subscriptions": scraper_name}, "$setOnInsert": {"user_id": user_id}},
+            [{"$set": {"user_id": user_id, "subscriptions": {"$concatArrays": [kept, added]}}}],
             upsert=True,
         )
 
-    def remove_subscription(self, user_id: int, scraper_name: str) -> None:
-        self.users_collection.update_one({"user_id": user_id}, {"$pull": {"subscriptions": scraper_name}})
-
     def get_user_subscriptions(self, user_id: int) -> list[str]:
         user = self.users_collection.find_one({"user_id": user_id})
         return user.get("subscriptions", []) if user else []
@@ -66,6 +118,29 @@ class DBManager:
         cursor = self.users_collection.find({"subscriptions": scraper_name}, {"user_id": 1})
         return [doc["user_id"] for doc in cursor]
 
+    def get_scraper_subscriber_filters(self, scraper_name: str) -> dict[int, dict]:
+        """user_id -> keyword_filters doc ({} when unset) for everyone subscribed to the scraper."""
+        cursor = self.users_collection.find({"subscriptions": scraper_name}, {"user_id": 1, "keyword_filters": 1})
+        return {doc["user_id"]: doc.get("keyword_filters") or {} for doc in cursor}
+
+    def get_keyword_filters(self, user_id: int) -> dict:
+        user = self.users_collection.find_one({"user_id": user_id}, {"keyword_filters": 1})
+        return (user or {}).get("keyword_filters") or {}
+
+    def add_keyword_filters(self, user_id: int, kind: str, keywords: list[str]) -> None:
+        """kind is "include" or "exclude"; a keyword moves out of the other list."""
+        other = "exclude" if kind == "include" else "include"
+        self.users_collection.update_one(
+            {"user_id": user_id},
+            {
+                "$addToSet": {f"keyword_filters.{kind}": {"$each": keywords}},
+                "$pull": {f"keyword_filters.{other}": {"$in": keywords}},
+            },
+        )
+
+    def clear_keyword_filters(self, user_id: int) -> None:
+        self.users_collection.update_one({"user_id": user_id}, {"$unset": {"keyword_filters": ""}})
+
     def is_scraping_enabled(self) -> bool:
         doc = self.runtime_state_collection.find_one({"_id": "global"})
         return bool(doc.get("scraping_enabled", True)) if doc else True
@@ -75,11 +150,180 @@ class DBManager:
             {"_id": "global"}, {"$set": {"scraping_enabled": enabled}}, upsert=True
         )
 
-    def set_last_scrape_at(self) -> None:
-        self.runtime_state_collection.update_one(
-            {"_id": "global"}, {"$set": {"last_scrape_at": datetime.now(UTC)}}, upsert=True
-        )
+    def set_last_scrape_at(self, quick: bool = False) -> None:
+        field = "last_quick_scrape_at" if quick else "last_scrape_at"
+        self.runtime_state_collection.update_one({"_id": "global"}, {"$set": {field: datetime.now(UTC)}}, upsert=True)
 
-    def get_last_scrape_at(self) -> datetime | None:
+    def get_last_scrape_at(self, quick: bool = False) -> datetime | None:
         doc = self.runtime_state_collection.find_one({"_id": "global"})
-        return doc.get("last_scrape_at") if doc else None
+        return doc.get("last_quick_scrape_at" if quick else "last_scrape_at") if doc else None
+
+    def get_breaker_state(self, scraper_name: str) -> dict | None:
+        return self.runtime_state_collection.find_one({"_id": f"breaker:{scraper_name}"})
+
+    def set_breaker_state(self, scraper_name: str, state: dict) -> None:
+        self.runtime_state_collection.update_one({"_id": f"breaker:{scraper_name}"}, {"$set": state}, upsert=True)
+
+    # --- Scrape requests (bot -> worker) ---
+
+    def request_scrape(self, requested_by: int) -> None:
+        self.scrape_requests_collection.insert_one(
+            {"status": "pending", "requested_by": requested_by, "created_at": datetime.now(UTC)}
+        )
+
+    def claim_scrape_request(self, holder: str) -> dict | None:
+        """Oldest pending request, marked running so no other worker takes it."""
+        return self.scrape_requests_collection.find_one_and_update(
+            {"status": "pending"},
+            {"$set": {"status": "running", "claimed_by": holder, "claimed_at": datetime.now(UTC)}},
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def finish_scrape_request(self, request_id, result: str) -> None:
+        self.scrape_requests_collection.update_one(
+            {"_id": request_id}, {"$set": {"status": "done", "result": result, "finished_at": datetime.now(UTC)}}
+        )
+
+    # --- Notification outbox ---
+
+    def enqueue_outbox_message(
+        self, message_id: str, user_ids: list[int], text: str, parse_mode: str | None = None
+    ) -> int:
+        """Persists a message and one pending job per recipient; returns how many jobs were new."""
+        now = datetime.now(UTC)
+        self.outbox_messages_collection.update_one(
+            {"_id": message_id},
+            {"$setOnInsert": {"text": text, "parse_mode": parse_mode, "created_at": now}},
+            upsert=True,
+        )
+        if not user_ids:
+            return 0
+        jobs = [
+            {
+                "message_id": message_id,
+                "user_id": user_id,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            }
+            for user_id in user_ids
+        ]
+        try:
+            return len(self.outbox_jobs_collection.insert_many(jobs, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            return e.details["nInserted"]
+
+    def get_outbox_message(self, message_id: str) -> dict | None:
+        return self.outbox_messages_collection.find_one({"_id": message_id})
+
+    def claim_outbox_job(self, lease: timedelta, shard: tuple[int, int] | None = None) -> dict | None:
+        """Atomically takes one due job; jobs whose sender died mid-flight are re-claimed once the lease runs out.
+
+        shard is (index, count): only claim jobs for users with user_id % count == index.
+        """
+        now = datetime.now(UTC)
+        query = {
+            "$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "lease_until": {"$lt": now}},
+            ]
+        }
+        if shard:
+            index, count = shard
+            query["user_id"] = {"$mod": [count, index]}
+        return self.outbox_jobs_collection.find_one_and_update(
+            query,
+            {"$set": {"status": "sending", "lease_until": now + lease}, "$inc": {"attempts": 1}},
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def complete_outbox_job(self, job_id) -> None:
+        self.outbox_jobs_collection.update_one(
+            {"_id": job_id}, {"$set": {"status": "sent", "finished_at": datetime.now(UTC)}}
+        )
+
+    def retry_outbox_job(self, job_id, delay: timedelta, error: str) -> None:
+        self.outbox_jobs_collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "pending", "next_attempt_at": datetime.now(UTC) + delay, "last_error": error}},
+        )
+
+    def fail_outbox_job(self, job_id, error: str) -> None:
+        self.outbox_jobs_collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "failed", "finished_at": datetime.now(UTC), "last_error": error}},
+        )
+
+    def count_outbox_jobs(self, message_id: str) -> dict[str, int]:
+        cursor = self.outbox_jobs_collection.aggregate(
+            [{"$match": {"message_id": message_id}}, {"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        )
+        return {doc["_id"]: doc["count"] for doc in cursor}
+
+    # --- Leases ---
+
+    def acquire_lease(self, name: str, holder: str, ttl: timedelta) -> bool:
+        """Takes or renews the named lease; False while another holder's lease hasn't expired."""
+        now = datetime.now(UTC)
+        try:
+            # matches our own or an expired lease; otherwise the upsert collides on _id
+            self.leases_collection.update_one(
+                {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": holder, "expires_at": now + ttl, "renewed_at": now}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def release_lease(self, name: str, holder: str) -> None:
+        self.leases_collection.delete_one({"_id": name, "holder": holder})
+
+    def get_lease(self, name: str) -> dict | None:
+        return self.leases_collection.find_one({"_id": name})
+
+    # --- Asset history ---
+
+    def add_history_entry(self, entry: dict) -> None:
+        self.asset_history_collection.insert_one(entry)
+
+    def get_history_keyframe(self, scraper_name: str, before: datetime | None = None) -> dict | None:
+        """Latest keyframe, or the latest one at or before `before`."""
+        query = {"scraper": scraper_name, "kind": "keyframe"}
+        if before:
+            query["timestamp"] = {"$lte": before}
+        return self.asset_history_collection.find_one(query, sort=[("timestamp", -1)])
+
+    def count_history_deltas(self, scraper_name: str, since: datetime) -> int:
+        return self.asset_history_collection.count_documents(
+            {"scraper": scraper_name, "kind": "delta", "timestamp": {"$gt": since}}
+        )
+
+    def get_history_deltas(self, scraper_name: str, since: datetime, until: datetime) -> list[dict]:
+        cursor = self.asset_history_collection.find(
+            {"scraper": scraper_name, "kind": "delta", "timestamp": {"$gt": since, "$lte": until}},
+            {"added": 1, "removed": 1},
+        ).sort("timestamp", ASCENDING)
+        return list(cursor)
+
+    def get_item_presence(self, scraper_name: str, item_id: str) -> list[tuple[datetime, bool]]:
+        """(timestamp, was free) for every keyframe and every delta touching the item, oldest first."""
+        cursor = self.asset_history_collection.aggregate(
+            [
+                {
+                    "$match": {
+                        "scraper": scraper_name,
+                        "$or": [{"kind": "keyframe"}, {"added": item_id}, {"removed": item_id}],
+                    }
+                },
+                {"$sort": {"timestamp": ASCENDING}},
+                # keyframes list every free id, matching deltas either added or removed it
+                {"$project": {"timestamp": 1, "present": {"$in": [item_id, {"$ifNull": ["$ids", "$added"]}]}}},
+            ]
+        )
+        return [(doc["timestamp"], doc["present"]) for doc in cursor]
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from utils.logger import setup_logger
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    body: bytes  # as sent, i.e. still compressed if the response was
+    headers: dict[str, str]  # the ones needed to read body back (content type/encoding)
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """On-disk store of response bodies and their validators (ETag/Last-Modified), for conditional requests.
+
+    Least recently used entries are evicted once the bodies exceed max_bytes. Only responses carrying a
+    validator are kept, without one a conditional request can't be made.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.logger = setup_logger(__name__)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(url, meta.get("etag"), meta.get("last_modified"), body, meta.get("headers", {}))
+
+    def store(
+        self,
+        url: str,
+        etag: str | None,
+        last_modified: str | None,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        if not etag and not last_modified:
+            return
+        meta_path, body_path = self._paths(url)
+        body_path.write_bytes(body)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "headers": headers or {}}
+        meta_path.write_text(json.dumps(meta))
+        self._evict()
+
+    def touch(self, url: str) -> None:
+        """Marks an entry as just used, for LRU eviction."""
+        for path in self._paths(url):
+            try:
+                path.touch()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        for path in self.directory.iterdir():
+            path.unlink(missing_ok=True)
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def _evict(self) -> None:
+        bodies = [(path.stat(), path) for path in self.directory.glob("*.body")]
+        total = sum(stat.st_size for stat, _ in bodies)
+        for stat, path in sorted(bodies, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+            total -= stat.st_size
+
+
+def get_http_cache(namespace: str) -> HttpCache | None:
+    """Cache under HTTP_CACHE_DIR/<namespace>, None when HTTP_CACHE_DIR isn't set."""
+    directory = os.environ.get("HTTP_CACHE_DIR")
+    if not directory:
+        return None
+    max_bytes = int(os.environ.get("HTTP_CACHE_MAX_MB", DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024
+    return HttpCache(Path(directory) / namespace, max_bytes)
+
+
+# response headers a replayed body depends on
+REPLAYED_HEADERS = ("Content-Type", "Content-Encoding")
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Revalidates GETs against the cache; a 304 is answered from disk as a 200 with extensions["cache_hit"]."""
+
+    def __init__(self, cache: HttpCache, transport: httpx.AsyncBaseTransport | None = None):
+        self.cache = cache
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        entry = self.cache.lookup(url) if request.method == "GET" else None
+        if entry:
+            request.headers.update(entry.conditional_headers())
+
+        response = await self.transport.handle_async_request(request)
+        if entry and response.status_code == 304:
+            await response.aclose()
+            self.cache.hits += 1
+            self.cache.touch(url)
+            validators = {"ETag": entry.etag, "Last-Modified": entry.last_modified}
+            headers = entry.headers | {name: value for name, value in validators.items() if value}
+            return httpx.Response(200, headers=headers, content=entry.body, extensions={"cache_hit": True})
+
+        if request.method != "GET" or response.status_code != 200:
+            return response
+        self.cache.misses += 1
+        # raw bytes, so the replayed response decodes exactly like the original
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        kept = {name: response.headers[name] for name in REPLAYED_HEADERS if name in response.headers}
+        self.cache.store(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), body, kept)
+        return httpx.Response(200, headers=response.headers, content=body, extensions=response.extensions)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,93 @@
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton: finds every keyword in a text in one pass, case-insensitively."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[frozenset[str]] = [frozenset()]
+
+        for keyword in {keyword.casefold() for keyword in keywords if keyword}:
+            node = 0
+            for char in keyword:
+                if char not in self._goto[node]:
+                    self._goto[node][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                node = self._goto[node][char]
+            self._out[node] |= {keyword}
+
+        # breadth-first so every fail link points at an already finished, shallower node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] |= self._out[self._fail[child]]
+
+    def find(self, text: str) -> frozenset[str]:
+        """Keywords occurring at the start of a word: "sound" matches "Sounds", "ui" doesn't match "build"."""
+        text = text.casefold()
+        node = 0
+        found = set()
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for keyword in self._out[node]:
+                start = end - len(keyword) + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    found.add(keyword)
+        return frozenset(found)
+
+
+@dataclass(frozen=True)
+class KeywordFilter:
+    """A user's title filter: keep titles with any include keyword (if set) and no exclude keyword."""
+
+    include: frozenset[str] = frozenset()
+    exclude: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_doc(cls, doc: dict | None) -> "KeywordFilter":
+        doc = doc or {}
+        return cls(
+            frozenset(keyword.casefold() for keyword in doc.get("include", [])),
+            frozenset(keyword.casefold() for keyword in doc.get("exclude", [])),
+        )
+
+    def is_empty(self) -> bool:
+        return not self.include and not self.exclude
+
+    def key(self) -> str:
+        """Same for equal filters in any process, unlike hash()."""
+        return f"+{','.join(sorted(self.include))}-{','.join(sorted(self.exclude))}"
+
+
+class KeywordFilterIndex:
+    """All users' filters compiled into one matcher; each title is scanned once however many filters use it."""
+
+    def __init__(self, filters: Iterable[KeywordFilter]):
+        keywords = set()
+        for keyword_filter in filters:
+            keywords |= keyword_filter.include | keyword_filter.exclude
+        self._matcher = KeywordMatcher(keywords)
+        self._matches: dict[str, frozenset[str]] = {}
+
+    def allows(self, keyword_filter: KeywordFilter, title: str) -> bool:
+        matched = self._matches.get(title)
+        if matched is None:
+            matched = self._matches[title] = self._matcher.find(title)
+        if keyword_filter.include and not matched & keyword_filter.include:
+            return False
+        return not matched & keyword_filter.exclude
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import socket
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+from utils.db_manager import DBManager
+from utils.logger import setup_logger
+
+
+def get_replica_shard() -> tuple[int, int] | None:
+    """(index, count) from REPLICA_INDEX/REPLICA_COUNT, None when running a single replica."""
+    count = int(os.environ.get("REPLICA_COUNT", "1"))
+    if count <= 1:
+        return None
+    index = int(os.environ["REPLICA_INDEX"])
+    if not 0 <= index < count:
+        raise ValueError(f"REPLICA_INDEX must be in [0, {count}), got {index}")
+    return index, count
+
+
+class Lease:
+    """Mongo-backed leader lease: whoever holds it does the work, the rest skip.
+
+    The holder renews it every ttl/3 while working; a crashed holder stops renewing and the
+    lease frees up once its ttl runs out.
+    """
+
+    def __init__(self, db_manager: DBManager, name: str, ttl: timedelta = timedelta(minutes=2)):
+        self.logger = setup_logger(__name__)
+        self.db_manager = db_manager
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire(self) -> bool:
+        return self.db_manager.acquire_lease(self.name, self.holder, self.ttl)
+
+    def release(self) -> None:
+        self.db_manager.release_lease(self.name, self.holder)
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[bool]:
+        """Yields whether we got the lease; keeps it renewed until the block exits."""
+        if not self.acquire():
+            lease = self.db_manager.get_lease(self.name) or {}
+            self.logger.info(f"Lease [{self.name}] is held by {lease.get('holder', '?')}")
+            yield False
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            yield True
+        finally:
+            heartbeat.cancel()
+            self.release()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.ttl.total_seconds() / 3)
+            try:
+                renewed = self.acquire()
+            except Exception as e:
+                self.logger.warning(f"Failed to renew lease [{self.name}]: {e}")
+                continue
+            if not renewed:
+                # only happens if we stalled past the ttl; another replica may be working in parallel now
+                self.logger.error(f"Lost lease [{self.name}] to another holder")
@@ -1,16 +1,120 @@
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
 import sys
+import threading
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = "%(asctime)s | %(name)-26s | %(levelname)-8s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log collectors."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the below-WARNING records of the given logger prefixes, e.g. {"scrapers.itch_scraper": 0.1}.
+
+    Deterministic: with rate 0.25 the 4th, 8th, 12th... record passes, with rate 0 none; warnings and errors
+    always do. Filters run in whichever thread logs, the credit is updated under a lock.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._credit = dict(rates)
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        prefix = self._match(record.name)
+        if prefix is None:
+            return True
+        with self._lock:
+            # a hair under 1: ten additions of 0.1 come to 0.999...
+            keep = self._credit[prefix] >= 1 - 1e-9
+            if keep:
+                self._credit[prefix] -= 1
+            self._credit[prefix] += self.rates[prefix]
+        return keep
+
+    def _match(self, name: str) -> str | None:
+        # most specific prefix wins
+        best = None
+        for prefix in self.rates:
+            if (name == prefix or name.startswith(prefix + ".")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return best
+
+
+def parse_sampling(spec: str) -> dict[str, float]:
+    """Parses LOG_SAMPLING, e.g. "scrapers.itch_scraper=0.1,telegram.ext=0.5", into {logger prefix: kept fraction}."""
+    rates = {}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = part.partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    # the stock prepare() formats the whole line in the caller; resolve only what can't wait (args, traceback)
+    # and leave the layout to the listener's formatter, so JSON output still sees the separate fields
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def make_queue_handler(target: logging.Handler) -> tuple[QueueHandler, QueueListener]:
+    """Handler that only enqueues, plus the listener thread writing to `target`; start the listener yourself."""
+    log_queue = queue.SimpleQueue()
+    return _DeferredFormatQueueHandler(log_queue), QueueListener(log_queue, target, respect_handler_level=True)
 
 
 def setup_logger(name: str = None) -> logging.Logger:
     root = logging.getLogger()
     if not root.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(
-            logging.Formatter(
-                fmt="%(asctime)s | %(name)-26s | %(levelname)-8s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-            )
-        )
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if os.environ.get("LOG_FORMAT", "text") == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT))
+
+        # queue mode (default): callers only enqueue, a listener thread does the stdout writes, so a backed-up
+        # log pipe can't stall the event loop; LOG_MODE=sync writes inline, e.g. when debugging a crash
+        if os.environ.get("LOG_MODE", "queue") == "sync":
+            handler = stream_handler
+        else:
+            handler, listener = make_queue_handler(stream_handler)
+            listener.start()
+            atexit.register(listener.stop)  # flushes what's still queued
+
+        if sampling := os.environ.get("LOG_SAMPLING"):
+            handler.addFilter(SamplingFilter(parse_sampling(sampling)))
         root.addHandler(handler)
         root.setLevel(logging.INFO)
         # Quiet the per-request/polling spam, keep their warnings
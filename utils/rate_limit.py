@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+# In-memory, per process: the point is to turn a flood away before it costs a DB call, so with several
+# replicas each allows its own share, which is still a bounded amount of traffic per user.
+DEFAULT_MAX_KEYS = 100_000
+
+
+@dataclass
+class TokenBucket:
+    capacity: float
+    rate: float  # tokens refilled per second
+    tokens: float
+    updated: float
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class RateLimiter:
+    """A token bucket per (user, action); limits maps an action to (burst capacity, tokens per second).
+
+    Actions without their own limit share the "default" one. The least recently used buckets are dropped
+    past max_keys, which only forgives those users a partly drained bucket.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]],
+        max_keys: int = DEFAULT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limits = limits
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: OrderedDict[tuple[int, str], TokenBucket] = OrderedDict()
+
+    def allow(self, user_id: int, action: str) -> bool:
+        if action not in self.limits:
+            action = "default"
+        key = (user_id, action)
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            capacity, rate = self.limits[action]
+            bucket = self._buckets[key] = TokenBucket(capacity, rate, capacity, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(now)
+
+
+class RecentKeys:
+    """Remembers keys for `window` seconds: seen() is True for a repeat within the window, e.g. the same
+    button pressed twice in a row, or an unchanged user already written recently."""
+
+    def __init__(self, window: float, max_keys: int = DEFAULT_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        self._seen: OrderedDict[Hashable, float] = OrderedDict()
+
+    def seen(self, key: Hashable) -> bool:
+        now = self.clock()
+        last = self._seen.get(key)
+        if last is not None and now - last < self.window:
+            return True
+        # insertion order doubles as age order, the oldest entries go first
+        self._seen.pop(key, None)
+        self._seen[key] = now
+        while len(self._seen) > self.max_keys:
+            self._seen.popitem(last=False)
+        return False
+
+    def forget(self, key: Hashable) -> None:
+        self._seen.pop(key, None)
@@ -0,0 +1,6 @@
+def format_table(rows: list[tuple[str, ...]]) -> str:
+    """Left-aligned plain-text columns, two spaces apart; the first row is the header."""
+    widths = [max(len(cell) for cell in column) for column in zip(*rows, strict=True)]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths, strict=True)).rstrip() for row in rows
+    )